@@ -0,0 +1,188 @@
+"""Ligne de commande GestCharge, sans interface graphique (ni Qt).
+
+    python -m src.cli import materiels.csv [--sync]
+    python -m src.cli export inventaire.csv [--search "site:paris"]
+    python -m src.cli pdf inventaire.pdf [--by location]
+    python -m src.cli stats [--json | --verify | --rebuild]
+"""
+import argparse
+import json
+import sys
+
+# Les modules de données (SQLAlchemy, reportlab) ne sont importés qu'à l'exécution
+# d'une commande : --help et les erreurs d'arguments répondent immédiatement.
+
+# Regroupements des rapports PDF : option --by -> champ
+REPORT_GROUPINGS = {"location": "location", "category": "category", "user": "assigned_user"}
+# Regroupements des statistiques : clé du résultat -> libellé
+STATISTICS_LABELS = {"categories": "Catégories", "locations": "Localisations", "users": "Utilisateurs"}
+
+
+def _open_inventory(args):
+    from sqlalchemy.orm import Session
+    from src.database.db_setup import create_database_engine, engine, setup_database
+    from src.utils.inventory import Inventory
+
+    database_engine = create_database_engine(args.database) if args.database else engine
+    setup_database(database_engine)
+    return Inventory(Session(bind=database_engine, expire_on_commit=False))
+
+
+def _progress(args, label):
+    """Affiche la progression sur stderr (terminal uniquement) : fonction(lignes, fait, total)"""
+    if args.quiet or not sys.stderr.isatty():
+        return None
+
+    def progress(rows, done, total):
+        percent = int(done * 100 / total) if total else 100
+        print(f"\r{label} : {rows} lignes ({min(percent, 100)} %)", end="", file=sys.stderr, flush=True)
+    return progress
+
+
+def _rows_progress(progress):
+    # Progression comptée en lignes : progress(lignes, total)
+    return (lambda rows, total: progress(rows, rows, total)) if progress else None
+
+
+def _end_progress(args):
+    if not args.quiet and sys.stderr.isatty():
+        print(file=sys.stderr)
+
+
+def _search_ids(inventory, args):
+    return inventory.matching_ids(args.search) if args.search else None
+
+
+def run_import(args):
+    inventory = _open_inventory(args)
+    # Progression de l'import : lignes insérées et octets lus du fichier
+    result = inventory.import_csv(
+        args.file,
+        mode="merge" if args.sync else "append",
+        batch_size=args.batch_size,
+        workers=args.workers,
+        progress=_progress(args, "Import")
+    )
+    _end_progress(args)
+    print(
+        f"{result['inserted']} ajouté(s), {result['updated']} mis à jour, {result['unchanged']} inchangé(s) "
+        f"en {result['elapsed']:.1f} s ({result['rows_per_second']:.0f} lignes/s)"
+    )
+    return 0
+
+
+def run_export(args):
+    inventory = _open_inventory(args)
+    result = inventory.export(
+        args.file,
+        export_format=args.format,
+        where=inventory.search_clause(args.search) if args.search else None,
+        progress=_rows_progress(_progress(args, "Export"))
+    )
+    _end_progress(args)
+    print(f"{result['exported']} matériel(s) exporté(s) en {result['elapsed']:.1f} s")
+    return 0
+
+
+def run_pdf(args):
+    inventory = _open_inventory(args)
+    progress = _rows_progress(_progress(args, "Rapport"))
+    if args.by:
+        if args.search:
+            print("--search ne s'applique pas aux rapports par regroupement (--by)", file=sys.stderr)
+            return 2
+        result = inventory.write_report_bundle(args.output, REPORT_GROUPINGS[args.by], args.processes, progress)
+        _end_progress(args)
+        print(f"{result['reports']} rapport(s) et index.pdf : {result['exported']} matériel(s) en {result['elapsed']:.1f} s")
+        return 0
+    result = inventory.write_pdf(args.output, material_ids=_search_ids(inventory, args), progress=progress)
+    _end_progress(args)
+    print(f"{result['exported']} matériel(s) en {result['elapsed']:.1f} s")
+    return 0
+
+
+def run_stats(args):
+    from src.database.migrations import rebuild_summary_tables
+    from src.utils.inventory_stats import has_summary_tables, verify_summary_tables
+
+    inventory = _open_inventory(args)
+    session = inventory.session
+    if args.verify or args.rebuild:
+        if not has_summary_tables(session):
+            print("Compteurs indisponibles (base non SQLite)", file=sys.stderr)
+            return 1
+        if args.rebuild:
+            rebuild_summary_tables(session.connection())
+            session.commit()
+            print("Compteurs reconstruits")
+        differences = verify_summary_tables(session)
+        for grouping, value, counted, expected in differences:
+            print(f"{grouping} / {value if value is not None else '(vide)'} : compteur {counted}, réel {expected}")
+        print("Compteurs cohérents" if not differences else f"{len(differences)} écart(s) : relancer avec --rebuild")
+        return 1 if differences else 0
+
+    stats = inventory.statistics()
+    if args.json:
+        json.dump(stats, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print(f"Total : {stats['total']}")
+    print(f"Assignés : {stats['assigned']}")
+    print(f"Non assignés : {stats['unassigned']}")
+    for key, label in STATISTICS_LABELS.items():
+        print(f"\n{label} :")
+        for value, count in sorted(stats[key], key=lambda item: -item[1]):
+            print(f"  {value if value is not None else '(vide)'} : {count}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="GestCharge en ligne de commande")
+    parser.add_argument("--database", help="URL de la base (par défaut : configuration de l'application)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="ne pas afficher la progression")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="importer un fichier CSV")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--sync", action="store_true", help="mettre à jour les matériels existants (N° de série / adresse MAC)")
+    import_parser.add_argument("--workers", type=int, help="processus d'analyse du fichier (par défaut : automatique)")
+    import_parser.add_argument("--batch-size", type=int, help="lignes insérées par lot (par défaut : 5000)")
+    import_parser.set_defaults(handler=run_import)
+
+    export_parser = commands.add_parser("export", help="exporter en CSV ou JSON Lines")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=("csv", "jsonl"), help="par défaut : selon l'extension")
+    export_parser.add_argument("--search", help="n'exporter que les résultats de cette recherche (début des mots avec FTS5)")
+    export_parser.set_defaults(handler=run_export)
+
+    pdf_parser = commands.add_parser("pdf", help="générer le rapport PDF")
+    pdf_parser.add_argument("output", help="fichier PDF, ou dossier / archive .zip avec --by")
+    pdf_parser.add_argument("--by", choices=sorted(REPORT_GROUPINGS), help="un rapport par localisation, catégorie ou utilisateur")
+    pdf_parser.add_argument("--processes", type=int, help="processus de rendu avec --by (par défaut : un par cœur)")
+    pdf_parser.add_argument("--search", help="limiter le rapport aux résultats de cette recherche (début des mots avec FTS5)")
+    pdf_parser.set_defaults(handler=run_pdf)
+
+    stats_parser = commands.add_parser("stats", help="statistiques du tableau de bord")
+    stats_options = stats_parser.add_mutually_exclusive_group()
+    stats_options.add_argument("--json", action="store_true", help="sortie JSON")
+    stats_options.add_argument("--verify", action="store_true", help="vérifier les compteurs tenus par triggers")
+    stats_options.add_argument("--rebuild", action="store_true", help="recalculer les compteurs depuis la table materials")
+    stats_parser.set_defaults(handler=run_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from src.utils.inventory import InventoryError
+    try:
+        return args.handler(args)
+    except InventoryError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("\nOpération interrompue", file=sys.stderr)
+        return 130
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
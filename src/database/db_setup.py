@@ -1,14 +1,132 @@
-from sqlalchemy import create_engine
+import configparser
+import os
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
-from .models import Base
+from .models import Base, SEARCHABLE_FIELDS, fold_text
+from .migrations import run_migrations
 
-DATABASE_URL = "sqlite:///gestcharge.db"
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+DEFAULT_DATABASE_URL = "sqlite:///gestcharge.db"
+# Fichier de configuration optionnel (section [database], et [sqlite] pour les pragmas)
+CONFIG_FILE = os.environ.get("GESTCHARGE_CONFIG", "gestcharge.ini")
+
+# Pragmas appliqués à chaque connexion SQLite : WAL pour lire pendant les imports,
+# synchronous=NORMAL (sûr en WAL) pour limiter les fsync
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+# Taille du pool : connexion principale + threads d'import/export/chargement
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+
+def load_config(path=CONFIG_FILE):
+    config = configparser.ConfigParser()
+    config.read(path, encoding="utf-8")
+    return config
+
+def get_database_url(config=None):
+    """URL de la base : variable GESTCHARGE_DATABASE_URL, puis fichier de configuration"""
+    config = config if config is not None else load_config()
+    return (
+        os.environ.get("GESTCHARGE_DATABASE_URL")
+        or config.get("database", "url", fallback=None)
+        or DEFAULT_DATABASE_URL
+    )
+
+def _fold(value):
+    return fold_text(value) if isinstance(value, str) else value
+
+def create_database_engine(url=None, config=None):
+    """Crée le moteur SQLAlchemy (SQLite ou PostgreSQL) avec les réglages de performance"""
+    config = config if config is not None else load_config()
+    url = make_url(url or get_database_url(config))
+    options = {}
+    
+    in_memory = url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+    if not in_memory:
+        options["pool_size"] = config.getint("database", "pool_size", fallback=DEFAULT_POOL_SIZE)
+        options["max_overflow"] = config.getint("database", "max_overflow", fallback=DEFAULT_MAX_OVERFLOW)
+    if url.get_backend_name() != "sqlite":
+        # Serveur distant : détecter les connexions coupées
+        options["pool_pre_ping"] = True
+    
+    database_engine = create_engine(url, **options)
+    
+    if url.get_backend_name() == "sqlite":
+        pragmas = dict(SQLITE_PRAGMAS)
+        if config.has_section("sqlite"):
+            pragmas.update(config.items("sqlite"))
+        
+        @event.listens_for(database_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+            # fold() : recherche SQL sans accents ni casse, comme l'index en mémoire (voir queries.folded)
+            dbapi_connection.create_function("fold", 1, _fold, deterministic=True)
+    
+    return database_engine
+
+engine = create_database_engine()
+# Le cache de MaterialManager est tenu à jour explicitement : inutile de tout expirer à chaque commit
+Session = sessionmaker(bind=engine, expire_on_commit=False)
 session_factory = scoped_session(Session)
 
-def setup_database():
-    Base.metadata.create_all(engine)
+# Colonnes de materials indexées en plein texte
+FULLTEXT_COLUMNS = SEARCHABLE_FIELDS
+
+def setup_database(database_engine=None):
+    database_engine = database_engine if database_engine is not None else engine
+    Base.metadata.create_all(database_engine)
+    # Mise à niveau des bases existantes (create_all ne modifie pas une table existante)
+    run_migrations(database_engine)
+    if database_engine.dialect.name == "sqlite":
+        setup_fulltext_search(database_engine)
+
+def setup_fulltext_search(engine):
+    """Crée la table FTS5 miroir de materials et les triggers qui la synchronisent"""
+    columns = ", ".join(FULLTEXT_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in FULLTEXT_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in FULLTEXT_COLUMNS)
+    
+    with engine.begin() as connection:
+        exists = inspect(connection).has_table("materials_fts")
+        try:
+            # remove_diacritics : "siege" trouve "Siège"
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS materials_fts USING fts5("
+                f"{columns}, content='materials', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+        except Exception:
+            # SQLite compilé sans FTS5 : la recherche reste en mémoire
+            return False
+        
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS materials_fts_ai AFTER INSERT ON materials BEGIN "
+            f"INSERT INTO materials_fts(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS materials_fts_ad AFTER DELETE ON materials BEGIN "
+            f"INSERT INTO materials_fts(materials_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS materials_fts_au AFTER UPDATE ON materials BEGIN "
+            f"INSERT INTO materials_fts(materials_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO materials_fts(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        ))
+        
+        # Base existante : indexer les lignes déjà présentes
+        if not exists:
+            connection.execute(text("INSERT INTO materials_fts(materials_fts) VALUES ('rebuild')"))
+    return True
 
 def get_session():
     return session_factory()
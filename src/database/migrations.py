@@ -0,0 +1,135 @@
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select, text
+from .models import Material
+
+# Table de suivi des migrations appliquées (distincte des modèles)
+metadata = MetaData()
+schema_version = Table(
+    'schema_version', metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String, nullable=False)
+)
+
+# Table de compteurs tenue à jour par triggers (SQLite) : regroupement -> colonne de materials
+SUMMARY_TABLE = "material_counts"
+SUMMARY_GROUPINGS = {
+    "categories": "category",
+    "locations": "location",
+    "users": "assigned_user",
+}
+
+# Compteur de modifications de materials tenu par triggers (SQLite) : clé de l'instantané du cache
+CHANGE_COUNTER_TABLE = "material_changes"
+
+
+def _create_material_indexes(connection):
+    for index in Material.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _count_change(grouping, value, delta):
+    # Les NULL sont comptés à part (is_null) : une clé primaire SQLite ne les rend pas uniques
+    if delta > 0:
+        return (
+            f"INSERT INTO {SUMMARY_TABLE}(grouping, is_null, value, count) "
+            f"VALUES ('{grouping}', {value} IS NULL, coalesce({value}, ''), 1) "
+            f"ON CONFLICT(grouping, is_null, value) DO UPDATE SET count = count + 1;"
+        )
+    return (
+        f"UPDATE {SUMMARY_TABLE} SET count = count - 1 "
+        f"WHERE grouping = '{grouping}' AND is_null = ({value} IS NULL) AND value = coalesce({value}, '');"
+    )
+
+
+def _create_summary_tables(connection):
+    """Table des compteurs par catégorie / localisation / utilisateur et ses triggers.
+
+    Le tableau de bord lit ces compteurs au lieu de regrouper toute la table
+    materials ; rebuild_summary_tables les recalcule en cas d'écart.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    # IF NOT EXISTS : bases où la table a été créée avant cette migration
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} ("
+        f"grouping TEXT NOT NULL, is_null INTEGER NOT NULL, value TEXT NOT NULL, "
+        f"count INTEGER NOT NULL, PRIMARY KEY (grouping, is_null, value)) WITHOUT ROWID"
+    ))
+
+    increments = " ".join(_count_change(g, f"new.{c}", 1) for g, c in SUMMARY_GROUPINGS.items())
+    decrements = " ".join(_count_change(g, f"old.{c}", -1) for g, c in SUMMARY_GROUPINGS.items())
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE}_ai AFTER INSERT ON materials BEGIN {increments} END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE}_ad AFTER DELETE ON materials BEGIN {decrements} END"
+    ))
+    # Une modification ne touche que les compteurs de la colonne changée
+    for grouping, column in SUMMARY_GROUPINGS.items():
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE}_au_{column} "
+            f"AFTER UPDATE OF {column} ON materials WHEN old.{column} IS NOT new.{column} BEGIN "
+            f"{_count_change(grouping, f'old.{column}', -1)} {_count_change(grouping, f'new.{column}', 1)} END"
+        ))
+
+    # Compter les lignes déjà présentes
+    rebuild_summary_tables(connection)
+
+
+def rebuild_summary_tables(connection):
+    """Recalcule entièrement les compteurs depuis materials"""
+    connection.execute(text(f"DELETE FROM {SUMMARY_TABLE}"))
+    for grouping, column in SUMMARY_GROUPINGS.items():
+        connection.execute(text(
+            f"INSERT INTO {SUMMARY_TABLE}(grouping, is_null, value, count) "
+            f"SELECT '{grouping}', {column} IS NULL, coalesce({column}, ''), count(*) "
+            f"FROM materials GROUP BY {column} IS NULL, coalesce({column}, '')"
+        ))
+
+
+def _create_change_counter(connection):
+    """Compteur de modifications de materials : une ligne (jeton, version).
+
+    Chaque ligne insérée, modifiée ou supprimée incrémente version ; le jeton,
+    tiré au hasard à la création, distingue une base recréée au même
+    emplacement. Sert de clé à l'instantané du cache (voir utils.snapshot).
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {CHANGE_COUNTER_TABLE} ("
+        f"id INTEGER PRIMARY KEY CHECK (id = 1), token TEXT NOT NULL, version INTEGER NOT NULL)"
+    ))
+    connection.execute(text(
+        f"INSERT OR IGNORE INTO {CHANGE_COUNTER_TABLE}(id, token, version) VALUES (1, lower(hex(randomblob(8))), 0)"
+    ))
+    for suffix, operation in (("ai", "INSERT"), ("ad", "DELETE"), ("au", "UPDATE")):
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {CHANGE_COUNTER_TABLE}_{suffix} AFTER {operation} ON materials BEGIN "
+            f"UPDATE {CHANGE_COUNTER_TABLE} SET version = version + 1; END"
+        ))
+
+
+# Migrations dans l'ordre : (version, description, fonction(connection))
+MIGRATIONS = [
+    (1, "Index secondaires sur materials", _create_material_indexes),
+    (2, "Compteurs du tableau de bord (SQLite)", _create_summary_tables),
+    (3, "Compteur de modifications de materials (SQLite)", _create_change_counter),
+]
+
+
+def get_schema_version(connection):
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def run_migrations(engine):
+    """Applique les migrations manquantes, chacune dans sa propre transaction"""
+    metadata.create_all(engine)
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        with engine.begin() as connection:
+            if version <= get_schema_version(connection):
+                continue
+            migrate(connection)
+            connection.execute(schema_version.insert().values(version=version, description=description))
+        applied.append(version)
+    return applied
@@ -1,3 +1,5 @@
+import sys
+import unicodedata
 from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -7,12 +9,67 @@ class Material(Base):
     __tablename__ = 'materials'
     
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
-    serial_number = Column(String, nullable=True)
-    mac_address = Column(String, nullable=True)
+    # Index : tri de la liste, regroupements du tableau de bord, rapprochements à l'import
+    name = Column(String, nullable=False, index=True)
+    serial_number = Column(String, nullable=True, index=True)
+    mac_address = Column(String, nullable=True, index=True)
     brand_model = Column(String, nullable=True)
-    location = Column(String, nullable=True)
-    assigned_user = Column(String, nullable=True)
-    category = Column(String, nullable=True)
+    location = Column(String, nullable=True, index=True)
+    assigned_user = Column(String, nullable=True, index=True)
+    category = Column(String, nullable=True, index=True)
     assignment_date = Column(DateTime, nullable=True)
     comments = Column(String, nullable=True)
+
+# Colonnes textuelles sur lesquelles porte la recherche
+SEARCHABLE_FIELDS = (
+    "name", "serial_number", "mac_address", "brand_model",
+    "category", "location", "assigned_user", "comments"
+)
+
+
+def fold_text(text):
+    """Texte comparé par la recherche : minuscules, sans accents (comme remove_diacritics de FTS5)"""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+# Colonnes des enregistrements en lecture seule, dans l'ordre des requêtes
+RECORD_FIELDS = ("id",) + tuple(column.name for column in Material.__table__.columns if column.name != "id")
+# Colonnes aux valeurs très répétées : une seule chaîne partagée par valeur
+INTERNED_FIELDS = ("brand_model", "category", "location", "assigned_user")
+
+
+class MaterialRecord:
+    """Matériel en lecture pour le cache de l'interface.
+
+    Beaucoup plus léger qu'une instance ORM (pas d'état d'instance ni de
+    carte d'identité) ; les objets Material ne sont chargés que pour les
+    modifications.
+    """
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, id, name, serial_number, mac_address, brand_model, location,
+                 assigned_user, category, assignment_date, comments):
+        # Dans l'ordre de RECORD_FIELDS ; des affectations explicites plutôt qu'une
+        # boucle de setattr : trois fois plus rapide sur une table entière
+        self.id = id
+        self.name = name
+        self.serial_number = serial_number
+        self.mac_address = mac_address
+        self.brand_model = brand_model
+        self.location = location
+        self.assigned_user = assigned_user
+        self.category = category
+        self.assignment_date = assignment_date
+        self.comments = comments
+
+    @classmethod
+    def from_row(cls, row, _intern=sys.intern):
+        record = cls(*row)
+        for field in INTERNED_FIELDS:
+            value = getattr(record, field)
+            if value is not None:
+                setattr(record, field, _intern(value))
+        return record
@@ -1,20 +1,222 @@
+import re
+from sqlalchemy import Integer, String, and_, bindparam, column, delete, func, inspect, literal, or_, select, text, update
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Session
-from .models import Material
-from datetime import datetime
+from sqlalchemy.sql.functions import FunctionElement
+from .migrations import CHANGE_COUNTER_TABLE
+from .models import Material, MaterialRecord, RECORD_FIELDS, SEARCHABLE_FIELDS
 
 def add_material(session: Session, **kwargs):
     material = Material(**kwargs)
     session.add(material)
     return material
 
-def delete_material(session: Session, material_id: int):
-    material = session.query(Material).get(material_id)
-    if material:
-        session.delete(material)
-    return True
+# Nombre d'ids par clause IN : sous la limite de paramètres de SQLite (999 sur les anciennes versions)
+ID_CHUNK_SIZE = 500
 
-def update_material_field(session: Session, material_id: int, field_name: str, new_value: any):
-    material = session.query(Material).get(material_id)
-    if material:
-        setattr(material, field_name, new_value)
-    return material
+def _id_chunks(material_ids):
+    material_ids = list(material_ids)
+    for i in range(0, len(material_ids), ID_CHUNK_SIZE):
+        yield material_ids[i:i + ID_CHUNK_SIZE]
+
+def bulk_delete_materials(session: Session, material_ids):
+    """Supprime des matériels par DELETE ... WHERE id IN (...), par paquets ; retourne le nombre supprimé"""
+    deleted = 0
+    for chunk in _id_chunks(material_ids):
+        result = session.execute(delete(Material).where(Material.id.in_(chunk)))
+        deleted += result.rowcount
+    return deleted
+
+def bulk_update_materials(session: Session, material_ids, values: dict):
+    """Applique les mêmes valeurs (ex: utilisateur, localisation) à des matériels, par paquets d'UPDATE"""
+    updated = 0
+    for chunk in _id_chunks(material_ids):
+        result = session.execute(update(Material).where(Material.id.in_(chunk)).values(values))
+        updated += result.rowcount
+    return updated
+
+def apply_material_edits(session: Session, edits: dict):
+    """Écrit des modifications {id: {champ: valeur}} ; un UPDATE groupé par ensemble de champs modifiés.
+
+    Retourne le nombre de lignes modifiées.
+    """
+    table = Material.__table__
+    groups = {}
+    for material_id, fields in edits.items():
+        groups.setdefault(tuple(sorted(fields)), []).append(dict(fields, _id=material_id))
+    updated = 0
+    for fields, parameters in groups.items():
+        statement = update(table).where(table.c.id == bindparam('_id')).values(
+            {field: bindparam(field) for field in fields}
+        )
+        updated += session.execute(statement, parameters).rowcount
+    return updated
+
+def distinct_values(session: Session, field_name: str):
+    """Valeurs distinctes non vides d'une colonne, triées (choix proposés à l'utilisateur)"""
+    column = getattr(Material, field_name)
+    return list(session.execute(
+        select(column).where(column.isnot(None), column != "").distinct().order_by(column)
+    ).scalars())
+
+def get_max_material_id(session: Session):
+    """Plus grand id existant (0 si la table est vide)"""
+    return session.query(func.max(Material.id)).scalar() or 0
+
+def has_fulltext_search(session: Session):
+    """Indique si la table FTS5 materials_fts est disponible"""
+    bind = session.get_bind()
+    return bind.dialect.name == "sqlite" and inspect(bind).has_table("materials_fts")
+
+def get_change_version(session: Session):
+    """(jeton, version) du compteur de modifications de materials ; None sans compteur (base non SQLite)"""
+    bind = session.get_bind()
+    if bind.dialect.name != "sqlite" or not inspect(bind).has_table(CHANGE_COUNTER_TABLE):
+        return None
+    row = session.execute(text(f"SELECT token, version FROM {CHANGE_COUNTER_TABLE}")).first()
+    return tuple(row) if row is not None else None
+
+def fulltext_match_expression(terms):
+    """Construit une expression MATCH FTS5 à partir de termes (champ ou None, texte)"""
+    clauses = []
+    for field, value in terms:
+        # Chaque mot devient une recherche par préfixe ("dup" trouve "Dupont")
+        words = [f'"{word}"*' for word in re.findall(r"\w+", value)]
+        if not words:
+            continue
+        clause = " AND ".join(words)
+        clauses.append(f"{field} : ({clause})" if field else f"({clause})")
+    return " AND ".join(clauses) or None
+
+def search_materials_fts(session: Session, terms, limit: int = None):
+    """Retourne les ids des matériels correspondant aux termes, classés par pertinence"""
+    expression = fulltext_match_expression(terms)
+    if expression is None:
+        return None
+    
+    sql = "SELECT rowid FROM materials_fts WHERE materials_fts MATCH :expression ORDER BY rank"
+    params = {"expression": expression}
+    if limit is not None:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    return [row[0] for row in session.execute(text(sql), params)]
+
+def count_materials(session_or_connection, where=None):
+    statement = select(func.count(Material.id))
+    if where is not None:
+        statement = statement.where(where)
+    return session_or_connection.execute(statement).scalar()
+
+def iter_material_rows(session_or_connection, columns, batch_size: int = 1000, where=None):
+    """Parcourt les matériels par lots de tuples (ordre par nom) sans les charger en mémoire"""
+    table = Material.__table__
+    statement = select(*(table.c[name] for name in ("id",) + tuple(columns))).order_by(
+        table.c.name, table.c.id
+    ).execution_options(yield_per=batch_size)
+    if where is not None:
+        statement = statement.where(where)
+    result = session_or_connection.execute(statement)
+    for partition in result.partitions():
+        yield partition
+
+def material_partitions(session_or_connection, field_name: str):
+    """Valeurs d'un champ avec leur nombre de matériels (un GROUP BY), triées par valeur, None compris"""
+    column = getattr(Material, field_name)
+    statement = select(column, func.count()).group_by(column).order_by(column)
+    return [tuple(row) for row in session_or_connection.execute(statement)]
+
+def partition_clause(field_name: str, value):
+    """Filtre des matériels d'une partition de material_partitions"""
+    column = getattr(Material, field_name)
+    return column.is_(None) if value is None else column == value
+
+def material_records_statement(since_id: int = None):
+    """Requête Core des colonnes d'enregistrement (ordre par nom), pour MaterialRecord.from_row"""
+    table = Material.__table__
+    statement = select(*(table.c[name] for name in RECORD_FIELDS)).order_by(table.c.name, table.c.id)
+    if since_id is not None:
+        statement = statement.where(table.c.id > since_id)
+    return statement
+
+def page_key(material, sort_field):
+    """Clé (valeur de tri, id) d'un matériel, pour le paramètre after de fetch_material_page"""
+    return (getattr(material, sort_field), material.id)
+
+def _page_statement(sort_field, descending, after, null_values, where):
+    """Requête d'un segment de page : valeurs renseignées triées par (valeur, id) ou NULL triés par id.
+
+    La colonne de tri est utilisée telle quelle (sans coalesce) pour que la
+    base parcoure son index ix_materials_<champ> dans l'ordre.
+    """
+    sort_column = getattr(Material, sort_field)
+    statement = select(*(getattr(Material, name) for name in RECORD_FIELDS))
+    if where is not None:
+        statement = statement.where(where)
+    if null_values:
+        statement = statement.where(sort_column.is_(None))
+        if after is not None and after[0] is None:
+            statement = statement.where(Material.id < after[1] if descending else Material.id > after[1])
+        order = (Material.id,)
+    else:
+        statement = statement.where(sort_column.isnot(None))
+        if after is not None and after[0] is not None:
+            value, material_id = after
+            # (valeur, id) après la clé, écrit pour rester une plage sur l'index de la colonne
+            if descending:
+                statement = statement.where(sort_column <= value, or_(sort_column < value, Material.id < material_id))
+            else:
+                statement = statement.where(sort_column >= value, or_(sort_column > value, Material.id > material_id))
+        order = (sort_column, Material.id)
+    if descending:
+        order = tuple(expression.desc() for expression in order)
+    return statement.order_by(*order)
+
+def fetch_material_page(session: Session, sort_field="name", descending=False, after=None, limit=500, where=None):
+    """Page d'enregistrements suivant la clé after=(valeur de tri, id) : pagination par clé sur (tri, id).
+
+    Les valeurs NULL viennent après les autres (avant en ordre décroissant) ;
+    chaque segment est lu par sa propre requête.
+    """
+    segments = [True, False] if descending else [False, True]
+    if after is not None:
+        segments = segments[segments.index(after[0] is None):]
+    records = []
+    for null_values in segments:
+        statement = _page_statement(sort_field, descending, after, null_values, where)
+        rows = session.execute(statement.limit(limit - len(records)))
+        records.extend(MaterialRecord.from_row(row) for row in rows)
+        if len(records) >= limit:
+            break
+    return records
+
+class folded(FunctionElement):
+    """Texte sans accents ni casse pour la recherche SQL : fonction fold() enregistrée par db_setup sur
+    chaque connexion SQLite (fold_text, comme l'index en mémoire), lower() sur les autres bases"""
+    type = String()
+    inherit_cache = True
+
+@compiles(folded)
+def _compile_folded(element, compiler, **kw):
+    return f"lower({compiler.process(element.clauses, **kw)})"
+
+@compiles(folded, "sqlite")
+def _compile_folded_sqlite(element, compiler, **kw):
+    return f"fold({compiler.process(element.clauses, **kw)})"
+
+def material_search_clause(terms, use_fulltext=False):
+    """Condition SQL équivalente à une recherche (termes de parse_query), pour filtrer côté base"""
+    if use_fulltext:
+        expression = fulltext_match_expression(terms)
+        if expression is None:
+            return None
+        matches = text(
+            "SELECT rowid FROM materials_fts WHERE materials_fts MATCH :expression"
+        ).bindparams(expression=expression).columns(column("rowid", Integer))
+        return Material.id.in_(matches)
+    
+    clauses = []
+    for field, value in terms:
+        fields = (field,) if field else SEARCHABLE_FIELDS
+        pattern = folded(literal("%" + value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"))
+        clauses.append(or_(*(folded(getattr(Material, name)).like(pattern, escape="\\") for name in fields)))
+    return and_(*clauses) if clauses else None
@@ -1,14 +1,56 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTabWidget, QWidget, QLabel, QGridLayout
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTabWidget, QWidget, QLabel, QGridLayout, QTableWidget, QTableWidgetItem, QHeaderView
 from PyQt5.QtChart import QChart, QChartView, QPieSeries, QBarSeries, QBarSet, QValueAxis, QBarCategoryAxis
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPainter, QBrush, QColor
-from sqlalchemy import func
-from src.database.models import Material
+from src.gui.workers import StatisticsWorker
+
+# Champ de materials -> regroupement des statistiques
+FIELD_GROUPINGS = {
+    "category": "categories",
+    "location": "locations",
+    "assigned_user": "users",
+}
+
+
+def top_counts(counts, limit):
+    """Sépare les limit valeurs les plus fréquentes des autres : (premières, autres)"""
+    ordered = sorted(counts, key=lambda item: (-item[1], item[0] or ""))
+    return ordered[:limit], ordered[limit:]
+
+
+def add_count(counts, value, delta):
+    """Ajoute delta au nombre de matériels d'une valeur ; une valeur qui n'en a plus est retirée"""
+    count = counts.get(value, 0) + delta
+    if count:
+        counts[value] = count
+    else:
+        counts.pop(value, None)
+
 
 class DashboardDialog(QDialog):
-    def __init__(self, session, parent=None):
+    # Valeurs affichées par graphique ; les suivantes sont regroupées dans "Autres"
+    TOP_N = 10
+    OTHERS_LABEL = "Autres"
+    # Au-delà de ce nombre de points, les animations sont désactivées
+    ANIMATION_MAX_POINTS = 20
+    OTHERS_TITLES = {
+        'categories': "Autres catégories",
+        'locations': "Autres localisations",
+        'users': "Autres utilisateurs",
+    }
+
+    def __init__(self, session, parent=None, events=None):
         super().__init__(parent)
         self.session = session
+        # Compteurs par regroupement ({valeur: nombre}, None compris), calculés dans un thread
+        # puis tenus à jour par les événements de MaterialManager
+        self.counts = None
+        # Calcul lancé dont le résultat n'a pas encore été reçu (le thread peut être déjà terminé)
+        self.computing = False
+        self.stale = False
+        # Points affichés par graphique construit (valeurs, "Autres", séries et axes)
+        self.points = {}
+        self.stats_label = None
         self.setWindowTitle("Tableau de Bord")
         self.setMinimumSize(800, 600)
         
@@ -45,22 +87,85 @@ class DashboardDialog(QDialog):
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
         
-        # Widget à onglets
-        tab_widget = QTabWidget()
-        
-        # Onglet Vue d'ensemble
-        overview_tab = self.create_overview_tab()
-        tab_widget.addTab(overview_tab, "Vue d'ensemble")
-        
-        # Onglet Localisation
-        location_tab = self.create_location_tab()
-        tab_widget.addTab(location_tab, "Par localisation")
-        
-        # Onglet Utilisateurs
-        users_tab = self.create_users_tab()
-        tab_widget.addTab(users_tab, "Par utilisateur")
-        
-        layout.addWidget(tab_widget)
+        # Widget à onglets : chaque onglet est construit à sa première ouverture
+        self.tab_widget = QTabWidget()
+        self.tab_builders = [
+            ("Vue d'ensemble", self.create_overview_tab),
+            ("Par localisation", self.create_location_tab),
+            ("Par utilisateur", self.create_users_tab),
+        ]
+        self.built_tabs = set()
+        # Messages d'attente des onglets pas encore construits, par index d'onglet
+        self.loading_labels = {}
+        for title, _ in self.tab_builders:
+            container = QWidget()
+            container_layout = QVBoxLayout(container)
+            container_layout.setContentsMargins(0, 0, 0, 0)
+            loading_label = QLabel("Calcul des statistiques…")
+            loading_label.setAlignment(Qt.AlignCenter)
+            container_layout.addWidget(loading_label)
+            self.loading_labels[self.tab_widget.addTab(container, title)] = loading_label
+        self.tab_widget.currentChanged.connect(self.build_tab)
+        
+        layout.addWidget(self.tab_widget)
+        
+        self.worker = StatisticsWorker(session.get_bind(), self)
+        self.worker.succeeded.connect(self.on_statistics_loaded)
+        self.worker.failed.connect(self.on_statistics_failed)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.start_worker()
+        
+        if events is not None:
+            events.added.connect(self.on_materials_added)
+            events.removed.connect(self.on_materials_removed)
+            events.changed.connect(self.on_materials_changed)
+            events.reset.connect(self.on_materials_reset)
+
+    def on_statistics_loaded(self, stats):
+        counts = {grouping: dict(stats[grouping]) for grouping in FIELD_GROUPINGS.values()}
+        if stats['unassigned']:
+            counts['users'][None] = stats['unassigned']
+        first_load = self.counts is None
+        self.counts = counts
+        if first_load:
+            self.build_tab(self.tab_widget.currentIndex())
+            return
+        for grouping in self.points:
+            self.refresh_chart(grouping)
+        self.refresh_overview()
+
+    def start_worker(self):
+        self.computing = True
+        self.worker.start()
+
+    def on_worker_finished(self):
+        # Reçu après le résultat du calcul
+        self.computing = False
+        # Des changements sont arrivés pendant le calcul : recalculer
+        if self.stale:
+            self.stale = False
+            self.start_worker()
+
+    def on_statistics_failed(self, message):
+        # Les onglets déjà construits gardent leurs statistiques précédentes
+        for loading_label in self.loading_labels.values():
+            loading_label.setText(f"Erreur lors du calcul des statistiques : {message}")
+
+    def build_tab(self, index):
+        if self.counts is None or index < 0 or index in self.built_tabs:
+            return
+        self.built_tabs.add(index)
+        container_layout = self.tab_widget.widget(index).layout()
+        # Remplacer le message d'attente par le contenu de l'onglet
+        loading_label = self.loading_labels.pop(index)
+        container_layout.removeWidget(loading_label)
+        loading_label.deleteLater()
+        container_layout.addWidget(self.tab_builders[index][1]())
+
+    def done(self, result):
+        # Ne pas détruire le dialogue pendant le calcul
+        self.worker.wait()
+        super().done(result)
 
     def create_overview_tab(self):
         tab = QWidget()
@@ -75,16 +180,11 @@ class DashboardDialog(QDialog):
         layout.addWidget(header_label, 0, 0, 1, 2)
         
         # Statistiques générales
-        stats = self.get_general_stats()
-        stats_label = QLabel(
-            f"<p style='font-size: 16px;'><b>Total matériels :</b> {stats['total']}</p>"
-            f"<p style='font-size: 16px;'><b>Matériels assignés :</b> {stats['assigned']}</p>"
-            f"<p style='font-size: 16px;'><b>Matériels non assignés :</b> {stats['unassigned']}</p>"
-        )
-        stats_label.setStyleSheet(
+        self.stats_label = QLabel(self.overview_text())
+        self.stats_label.setStyleSheet(
             "padding: 10px; background-color: #ffffff; border-radius: 5px;"
         )
-        layout.addWidget(stats_label, 1, 0)
+        layout.addWidget(self.stats_label, 1, 0)
         
         # Graphique par catégorie
         category_chart = self.create_category_chart()
@@ -92,6 +192,15 @@ class DashboardDialog(QDialog):
         
         return tab
 
+    def overview_text(self):
+        total = sum(self.counts['categories'].values())
+        unassigned = self.counts['users'].get(None, 0)
+        return (
+            f"<p style='font-size: 16px;'><b>Total matériels :</b> {total}</p>"
+            f"<p style='font-size: 16px;'><b>Matériels assignés :</b> {total - unassigned}</p>"
+            f"<p style='font-size: 16px;'><b>Matériels non assignés :</b> {unassigned}</p>"
+        )
+
     def create_location_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -112,40 +221,24 @@ class DashboardDialog(QDialog):
         layout.addWidget(chart_view)
         return tab
 
-    def get_general_stats(self):
-        total = self.session.query(Material).count()
-        assigned = self.session.query(Material).filter(
-            Material.assigned_user.isnot(None)
-        ).count()
-        
-        return {
-            'total': total,
-            'assigned': assigned,
-            'unassigned': total - assigned
-        }
-
     def create_category_chart(self):
         series = QPieSeries()
         
-        categories = self.session.query(
-            Material.category, 
-            func.count(Material.id)
-        ).group_by(Material.category).all()
-        
-        for category, count in categories:
-            series.append(category or "Non catégorisé", count)
-        
-        # Rendre les étiquettes de chaque tranche visibles uniquement au survol
-        for slice in series.slices():
-            slice.setLabelVisible(False)  # Masquer les étiquettes par défaut
-            slice.setLabelBrush(QBrush(QColor("#333333")))
-            # Afficher l'étiquette lors du survol et la masquer lorsqu'on ne survole plus
-            slice.hovered.connect(lambda state, s=slice: s.setLabelVisible(state))
+        top, others = top_counts(self.counts['categories'].items(), self.TOP_N)
+        for category, count in top:
+            self.add_slice(series, category or "Non catégorisé", count)
+        if others:
+            # Tranche "Autres" : un clic affiche le détail
+            others_slice = self.add_slice(series, self.OTHERS_LABEL, sum(count for _, count in others))
+            others_slice.clicked.connect(lambda: self.show_others('categories'))
+        self.points['categories'] = {
+            'values': [category for category, _ in top], 'others': bool(others), 'series': series
+        }
             
         chart = QChart()
         chart.addSeries(series)
         chart.setTitle("Répartition par catégorie")
-        chart.setAnimationOptions(QChart.SeriesAnimations)
+        chart.setAnimationOptions(self.animation_options(series.count()))
         chart.legend().setVisible(True)
         chart.setBackgroundVisible(True)
         chart.setBackgroundBrush(QBrush(QColor("#ffffff")))
@@ -159,75 +252,45 @@ class DashboardDialog(QDialog):
         chartview.setMinimumSize(400, 300)
         return chartview
 
+    def add_slice(self, series, label, count):
+        # Étiquette visible uniquement au survol
+        slice = series.append(label, count)
+        slice.setLabelVisible(False)
+        slice.setLabelBrush(QBrush(QColor("#333333")))
+        slice.hovered.connect(lambda state, s=slice: s.setLabelVisible(state))
+        return slice
+
     def create_location_chart(self):
-        series = QBarSeries()
-        
-        locations = self.session.query(
-            Material.location, 
-            func.count(Material.id)
-        ).group_by(Material.location).all()
-        
-        barset = QBarSet("Nombre d'équipements")
-        categories = []
-        
-        for location, count in locations:
-            barset.append(count)
-            categories.append(location or "Non défini")
-        
-        series.append(barset)
-        
-        chart = QChart()
-        chart.addSeries(series)
-        chart.setTitle("Répartition par localisation")
-        chart.setAnimationOptions(QChart.SeriesAnimations)
-        chart.setBackgroundVisible(True)
-        chart.setBackgroundBrush(QBrush(QColor("#ffffff")))
-        chart.setPlotAreaBackgroundVisible(True)
-        chart.setPlotAreaBackgroundBrush(QBrush(QColor("#ffffff")))
-        chart.setTitleBrush(QBrush(QColor("#333333")))
-        chart.legend().setLabelBrush(QBrush(QColor("#333333")))
-        
-        axisX = QBarCategoryAxis()
-        axisX.append(categories)
-        axisX.setLabelsBrush(QBrush(QColor("#333333")))
-        chart.addAxis(axisX, Qt.AlignBottom)
-        series.attachAxis(axisX)
-        
-        axisY = QValueAxis()
-        axisY.setLabelsBrush(QBrush(QColor("#333333")))
-        chart.addAxis(axisY, Qt.AlignLeft)
-        series.attachAxis(axisY)
-        
-        chart.legend().setVisible(True)
-        
-        chartview = QChartView(chart)
-        chartview.setRenderHint(QPainter.Antialiasing)
-        chartview.setMinimumSize(400, 300)
-        return chartview
+        return self.create_bar_chart('locations', "Répartition par localisation", "Nombre d'équipements")
 
     def create_users_chart(self):
+        return self.create_bar_chart('users', "Équipements par utilisateur", "Équipements assignés")
+
+    def create_bar_chart(self, grouping, title, set_label):
         series = QBarSeries()
         
-        users = self.session.query(
-            Material.assigned_user, 
-            func.count(Material.id)
-        ).filter(
-            Material.assigned_user.isnot(None)
-        ).group_by(Material.assigned_user).all()
-        
-        barset = QBarSet("Équipements assignés")
+        barset = QBarSet(set_label)
         categories = []
         
-        for user, count in users:
+        counts = self.counts[grouping].items()
+        if grouping == 'users':
+            # Les matériels non assignés n'apparaissent que dans la vue d'ensemble
+            counts = [(user, count) for user, count in counts if user is not None]
+        top, others = top_counts(counts, self.TOP_N)
+        for value, count in top:
             barset.append(count)
-            categories.append(user)
+            categories.append(self.value_label(grouping, value))
+        if others:
+            barset.append(sum(count for _, count in others))
+            categories.append(self.OTHERS_LABEL)
+        self.connect_others_bar(barset, grouping)
         
         series.append(barset)
         
         chart = QChart()
         chart.addSeries(series)
-        chart.setTitle("Équipements par utilisateur")
-        chart.setAnimationOptions(QChart.SeriesAnimations)
+        chart.setTitle(title)
+        chart.setAnimationOptions(self.animation_options(barset.count()))
         chart.setBackgroundVisible(True)
         chart.setBackgroundBrush(QBrush(QColor("#ffffff")))
         chart.setPlotAreaBackgroundVisible(True)
@@ -247,8 +310,153 @@ class DashboardDialog(QDialog):
         series.attachAxis(axisY)
         
         chart.legend().setVisible(True)
+        self.points[grouping] = {
+            'values': [value for value, _ in top], 'others': bool(others),
+            'barset': barset, 'axis_x': axisX, 'axis_y': axisY
+        }
         
         chartview = QChartView(chart)
         chartview.setRenderHint(QPainter.Antialiasing)
         chartview.setMinimumSize(400, 300)
-        return chartview 
\ No newline at end of file
+        return chartview
+
+    def animation_options(self, points):
+        if points > self.ANIMATION_MAX_POINTS:
+            return QChart.NoAnimation
+        return QChart.SeriesAnimations
+
+    def value_label(self, grouping, value):
+        if value:
+            return value
+        return {'categories': "Non catégorisé", 'locations': "Non défini"}.get(grouping, "")
+
+    def connect_others_bar(self, barset, grouping):
+        """Un clic sur la barre "Autres" (toujours la dernière) affiche le détail"""
+        def on_clicked(index):
+            points = self.points[grouping]
+            if points['others'] and index == len(points['values']):
+                self.show_others(grouping)
+        barset.clicked.connect(on_clicked)
+
+    def others_counts(self, grouping):
+        """Valeurs regroupées dans "Autres" pour un graphique déjà construit"""
+        shown = set(self.points[grouping]['values'])
+        return [
+            (value, count) for value, count in self.counts[grouping].items()
+            if value not in shown and not (grouping == 'users' and value is None)
+        ]
+
+    def show_others(self, grouping):
+        """Détail des valeurs regroupées dans "Autres", par nombre décroissant"""
+        others, _ = top_counts(self.others_counts(grouping), len(self.counts[grouping]))
+        dialog = QDialog(self)
+        dialog.setWindowTitle(self.OTHERS_TITLES[grouping])
+        dialog.setMinimumSize(400, 500)
+        layout = QVBoxLayout(dialog)
+        
+        table = QTableWidget(len(others), 2)
+        table.setHorizontalHeaderLabels(["Valeur", "Nombre"])
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for row, (value, count) in enumerate(others):
+            table.setItem(row, 0, QTableWidgetItem(self.value_label(grouping, value)))
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.DisplayRole, count)
+            table.setItem(row, 1, count_item)
+        layout.addWidget(table)
+        
+        dialog.exec_()
+
+    # Mise à jour en direct
+    def on_materials_added(self, materials):
+        self.apply_deltas((material, field_name, None, 1) for material in materials for field_name in FIELD_GROUPINGS)
+
+    def on_materials_removed(self, materials):
+        self.apply_deltas((material, field_name, None, -1) for material in materials for field_name in FIELD_GROUPINGS)
+
+    def on_materials_changed(self, changes):
+        deltas = []
+        for material, field_name, old_value in changes:
+            if field_name in FIELD_GROUPINGS:
+                deltas.append((material, field_name, old_value, 0))
+        self.apply_deltas(deltas)
+
+    def on_materials_reset(self):
+        # Changement non détaillé (rechargement complet) : recalculer dans le thread
+        if self.computing:
+            self.stale = True
+        else:
+            self.start_worker()
+
+    def apply_deltas(self, deltas):
+        """Applique des variations (matériel, champ, ancienne valeur, sens) aux compteurs et aux graphiques.
+
+        sens 1 / -1 : ajout / suppression ; 0 : modification de ancienne valeur vers la valeur actuelle.
+        """
+        if self.computing:
+            # Le résultat attendu remplacera les compteurs sans ces variations : le recalculer
+            self.stale = True
+        if self.counts is None:
+            return
+        touched = set()
+        for material, field_name, old_value, direction in deltas:
+            grouping = FIELD_GROUPINGS[field_name]
+            counts = self.counts[grouping]
+            value = getattr(material, field_name)
+            if direction == 0:
+                if old_value == value:
+                    continue
+                add_count(counts, old_value, -1)
+                add_count(counts, value, 1)
+            else:
+                add_count(counts, value, direction)
+            touched.add(grouping)
+        for grouping in touched:
+            self.refresh_chart(grouping)
+        if touched:
+            self.refresh_overview()
+
+    def refresh_overview(self):
+        if self.stats_label is not None:
+            self.stats_label.setText(self.overview_text())
+
+    def refresh_chart(self, grouping):
+        """Met à jour les valeurs d'un graphique construit, sans le recréer"""
+        points = self.points.get(grouping)
+        if points is None:
+            return
+        counts = self.counts[grouping]
+        values = points['values']
+        # Nouvelle valeur : point supplémentaire tant qu'il y a de la place, sinon dans "Autres"
+        for value in counts:
+            if value in values or (grouping == 'users' and value is None):
+                continue
+            if len(values) < self.TOP_N and not points['others']:
+                values.append(value)
+                self.append_point(grouping, self.value_label(grouping, value), 0)
+            elif not points['others']:
+                points['others'] = True
+                self.append_point(grouping, self.OTHERS_LABEL, 0)
+        
+        others_total = sum(count for _, count in self.others_counts(grouping))
+        totals = [counts.get(value, 0) for value in values]
+        if points['others']:
+            totals.append(others_total)
+        if 'series' in points:
+            for slice, count in zip(points['series'].slices(), totals):
+                slice.setValue(count)
+        else:
+            for index, count in enumerate(totals):
+                points['barset'].replace(index, count)
+            points['axis_y'].setRange(0, max(totals, default=0) or 1)
+
+    def append_point(self, grouping, label, count):
+        points = self.points[grouping]
+        if 'series' in points:
+            slice = self.add_slice(points['series'], label, count)
+            if label == self.OTHERS_LABEL:
+                slice.clicked.connect(lambda: self.show_others(grouping))
+        else:
+            points['barset'].append(count)
+            points['axis_x'].append(label)
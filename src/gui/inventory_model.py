@@ -0,0 +1,371 @@
+from collections import OrderedDict
+from datetime import datetime
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from src.database.queries import fetch_material_page, page_key
+
+
+def material_order(material):
+    """Ordre d'affichage par défaut : (nom, id), comme les requêtes de chargement"""
+    return (material.name, material.id)
+
+
+def bisect_key(items, value, key=material_order):
+    """Position d'insertion de value dans items trié par key.
+
+    Équivaut à bisect_left(items, value, key=key), dont le paramètre key
+    n'existe qu'à partir de Python 3.10.
+    """
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high) // 2
+        if key(items[middle]) < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def insert_sorted(items, item, key=material_order):
+    """Insère item à sa place dans items trié par key"""
+    items.insert(bisect_key(items, key(item), key), item)
+
+
+def sort_materials(materials):
+    """Trie la liste sur place par material_order ; True si l'ordre a changé.
+
+    Les requêtes chargent déjà par (nom, id) mais la collation de la base
+    (ex: PostgreSQL) peut différer de la comparaison des chaînes Python,
+    sur laquelle reposent les recherches par dichotomie du cache.
+    """
+    keys = list(map(material_order, materials))
+    if all(previous <= key for previous, key in zip(keys, keys[1:])):
+        return False
+    materials.sort(key=material_order)
+    return True
+
+
+class InventoryTableModel(QAbstractTableModel):
+    """Modèle de la table d'inventaire : seules les lignes visibles sont matérialisées par la vue"""
+
+    HEADERS = [
+        "Nom", "Numéro de Série", "Catégorie", "Adresse MAC",
+        "Marque/Modèle", "Localisation", "Utilisateur Assigné",
+        "Date d'Assignement", "Commentaires"
+    ]
+    FIELDS = [
+        "name", "serial_number", "category", "mac_address",
+        "brand_model", "location", "assigned_user",
+        "assignment_date", "comments"
+    ]
+
+    # Émis après une édition dans la table : (ligne, colonne, nouveau texte)
+    cellEdited = pyqtSignal(int, int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._materials = []
+        self._rows = []
+        self._sort_column = None
+        self._sort_order = Qt.AscendingOrder
+        # Lignes dans l'ordre material_order : recherche d'une ligne par dichotomie
+        self._ordered = True
+
+    # Données
+    def set_materials(self, materials):
+        """Remplace l'ensemble des matériels affichés (triés par material_order)"""
+        self.beginResetModel()
+        self._materials = materials
+        self._rows = list(materials)
+        self._ordered = True
+        self._apply_sort()
+        self.endResetModel()
+
+    def set_rows(self, rows, ordered=True):
+        """Remplace le vecteur des lignes visibles (résultat d'un filtre).
+
+        ordered=False signale des lignes qui ne suivent pas material_order
+        (ex: résultats classés par pertinence).
+        """
+        self.beginResetModel()
+        self._rows = rows if rows is not None else list(self._materials)
+        self._ordered = ordered or rows is None
+        self._apply_sort()
+        self.endResetModel()
+
+    def append_rows(self, materials):
+        """Ajoute des lignes visibles en fin de table (chargement progressif)"""
+        if not materials:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(materials) - 1)
+        self._rows.extend(materials)
+        self.endInsertRows()
+
+    def sort_rows(self):
+        """Réapplique le tri courant (ex: après un chargement progressif)"""
+        if self._sort_column is not None:
+            self.sort(self._sort_column, self._sort_order)
+
+    def material(self, row):
+        return self._rows[row]
+
+    def material_id(self, row):
+        return self._rows[row].id
+
+    def refresh_row(self, row):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    # Mises à jour incrémentales
+    def find_row(self, material):
+        """Ligne d'un matériel, -1 s'il n'est pas affiché"""
+        rows = self._rows
+        if self._ordered and self._sort_column is None:
+            row = bisect_key(rows, material_order(material))
+            return row if row < len(rows) and rows[row].id == material.id else -1
+        for row, candidate in enumerate(rows):
+            if candidate.id == material.id:
+                return row
+        return -1
+
+    def insert_material(self, material):
+        """Insère une ligne à sa place dans l'ordre courant"""
+        rows = self._rows
+        if self._sort_column is not None:
+            key = self._sort_key()
+            value = key(material)
+            if self._sort_order == Qt.DescendingOrder:
+                row = next((i for i, m in enumerate(rows) if key(m) < value), len(rows))
+            else:
+                row = bisect_key(rows, value, key)
+        elif self._ordered:
+            row = bisect_key(rows, material_order(material))
+        else:
+            row = len(rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        rows.insert(row, material)
+        self.endInsertRows()
+
+    def remove_material(self, material):
+        row = self.find_row(material)
+        if row >= 0:
+            self._remove_row(row)
+
+    def update_material(self, material, field_name, value):
+        """Modifie un champ du matériel et rafraîchit sa ligne, déplacée si sa place a changé"""
+        # La ligne est cherchée avant la modification, tant que l'ordre est encore valide
+        row = self.find_row(material)
+        setattr(material, field_name, value)
+        if row < 0:
+            return
+        if self._in_place(row):
+            self.refresh_row(row)
+        else:
+            self._remove_row(row)
+            self.insert_material(material)
+
+    def _remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+    def _in_place(self, row):
+        if self._sort_column is not None:
+            key = self._sort_key()
+        elif self._ordered:
+            key = material_order
+        else:
+            return True
+        rows = self._rows
+        value = key(rows[row])
+        before = key(rows[row - 1]) if row > 0 else None
+        after = key(rows[row + 1]) if row + 1 < len(rows) else None
+        if self._sort_column is not None and self._sort_order == Qt.DescendingOrder:
+            before, after = after, before
+        return (before is None or before <= value) and (after is None or value <= after)
+
+    # Interface QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.FIELDS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        material = self.material(index.row())
+        if material is None:
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.display_value(material, index.column())
+        if role == Qt.UserRole:
+            return material.id
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        text = str(value)
+        material = self.material(index.row())
+        if material is None or text == self.display_value(material, index.column()):
+            return False
+        self.cellEdited.emit(index.row(), index.column(), text)
+        # La valeur affichée est relue depuis le matériel (annulée si la mise à jour a échoué)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._sort_column = column
+        self._sort_order = order
+        self._apply_sort()
+        self.layoutChanged.emit()
+
+    # Utilitaires
+    @classmethod
+    def display_value(cls, material, column):
+        value = getattr(material, cls.FIELDS[column])
+        if value is None:
+            return ""
+        if column == 7:
+            return value.strftime("%d/%m/%Y")
+        return str(value)
+
+    def _sort_key(self):
+        column = self._sort_column
+        if column == 7:
+            return lambda m: (m.assignment_date is None, m.assignment_date or datetime.min)
+        field = self.FIELDS[column]
+        return lambda m: (getattr(m, field) or "").lower()
+
+    def _apply_sort(self):
+        if self._sort_column is None:
+            return
+        self._rows.sort(key=self._sort_key(), reverse=self._sort_order == Qt.DescendingOrder)
+
+
+class PagedInventoryTableModel(InventoryTableModel):
+    """Modèle paginé pour les très gros inventaires.
+
+    Les lignes sont lues par pages (pagination par clé sur (tri, id)) au fur
+    et à mesure du défilement (canFetchMore / fetchMore) ; seules les
+    MAX_RESIDENT_PAGES pages les plus récemment utilisées restent en mémoire,
+    les autres sont relues depuis la base à la demande. Le filtre et le tri
+    sont appliqués par la base.
+    """
+
+    PAGE_SIZE = 500
+    MAX_RESIDENT_PAGES = 20
+
+    def __init__(self, session, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self._where = None
+        self._pages = OrderedDict()
+        # _page_keys[p] : clé de la dernière ligne précédant la page p
+        self._page_keys = [None]
+        self._row_count = 0
+        self._exhausted = False
+
+    def reset(self, where=False):
+        """Vide les pages chargées ; where remplace le filtre SQL s'il est fourni"""
+        self.beginResetModel()
+        if where is not False:
+            self._where = where
+        self._pages.clear()
+        self._page_keys = [None]
+        self._row_count = 0
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_filter(self, where):
+        self.reset(where)
+
+    def loaded_material(self, material_id):
+        """Enregistrement d'un matériel s'il est dans une page chargée"""
+        for records in self._pages.values():
+            for record in records:
+                if record.id == material_id:
+                    return record
+        return None
+
+    def update_material(self, material, field_name, value):
+        """Reporte une modification sur l'enregistrement s'il est dans une page chargée"""
+        for page, records in self._pages.items():
+            for offset, record in enumerate(records):
+                if record.id == material.id:
+                    setattr(record, field_name, value)
+                    self.refresh_row(page * self.PAGE_SIZE + offset)
+                    return
+
+    def material(self, row):
+        page, offset = divmod(row, self.PAGE_SIZE)
+        materials = self._page(page)
+        # La page relue peut être plus courte si des lignes ont été supprimées entre-temps
+        return materials[offset] if offset < len(materials) else None
+
+    def material_id(self, row):
+        material = self.material(row)
+        return material.id if material is not None else None
+
+    # Interface QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        page = len(self._page_keys) - 1
+        materials = self._page(page)
+        if len(materials) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not materials:
+            return
+        self.beginInsertRows(QModelIndex(), self._row_count, self._row_count + len(materials) - 1)
+        self._row_count += len(materials)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        self.reset()
+
+    # Pages
+    def _page(self, page):
+        materials = self._pages.get(page)
+        if materials is not None:
+            self._pages.move_to_end(page)
+            return materials
+
+        sort_field = self.FIELDS[self._sort_column] if self._sort_column is not None else "name"
+        materials = fetch_material_page(
+            self.session,
+            sort_field=sort_field,
+            descending=self._sort_order == Qt.DescendingOrder,
+            after=self._page_keys[page],
+            limit=self.PAGE_SIZE,
+            where=self._where
+        )
+        if materials and page + 1 == len(self._page_keys) and len(materials) == self.PAGE_SIZE:
+            self._page_keys.append(page_key(materials[-1], sort_field))
+
+        self._pages[page] = materials
+        while len(self._pages) > self.MAX_RESIDENT_PAGES:
+            self._pages.popitem(last=False)
+        return materials
@@ -1,12 +1,12 @@
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTableWidget, QMessageBox, QFileDialog, QLineEdit, QWidget, QVBoxLayout, QMenu
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTableView, QAbstractItemView, QMessageBox, QFileDialog, QLineEdit, QWidget, QVBoxLayout, QMenu, QProgressDialog, QInputDialog
 from PyQt5.QtCore import Qt, QSettings
 from src.gui.add_item import AddItemDialog
 from src.database.db_setup import get_session
-from src.gui.dashboard import DashboardDialog
 from src.utils.theme_manager import ThemeManager
 from src.utils.material_manager import MaterialManager
 from src.gui.toolbar_manager import ToolbarManager
-from markdown import markdown
+from src.gui.workers import ImportWorker, ExportWorker, PdfWorker, ReportBundleWorker
+from src.database.queries import distinct_values
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -30,6 +30,7 @@ class MainWindow(QMainWindow):
     def init_managers(self):
         # Base de données
         self.session = get_session()
+        self.workers = set()
         
         # Gestionnaire de thème
         self.settings = QSettings('GestCharge', 'MainWindow')
@@ -41,9 +42,9 @@ class MainWindow(QMainWindow):
         self.addToolBar(self.toolbar_manager.toolbar)
         
         # Table et recherche
-        self.table_widget = QTableWidget()
+        self.table_view = QTableView()
         self.search_bar = QLineEdit()
-        self.material_manager = MaterialManager(self.session, self.table_widget)
+        self.material_manager = MaterialManager(self.session, self.table_view)
         
         # Appliquer le thème sauvegardé
         if self.dark_mode:
@@ -51,76 +52,215 @@ class MainWindow(QMainWindow):
 
     def setup_ui(self):
         # Configuration de la barre de recherche
-        self.search_bar.setPlaceholderText("Rechercher un matériel...")
+        self.update_search_hint()
         self.layout.addWidget(self.search_bar)
         
         # Configuration de la table
-        self.table_widget.setSelectionMode(QTableWidget.MultiSelection)
-        self.table_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.layout.addWidget(self.table_widget)
+        self.table_view.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.table_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        header = self.table_view.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.layout.addWidget(self.table_view)
 
     def setup_connections(self):
         self.search_bar.textChanged.connect(self.material_manager.filter_materials)
-        self.table_widget.customContextMenuRequested.connect(self.show_context_menu)
-        self.table_widget.itemChanged.connect(self.on_item_changed)
+        self.material_manager.events.reset.connect(self.update_search_hint)
+        self.table_view.customContextMenuRequested.connect(self.show_context_menu)
+        self.table_view.horizontalHeader().sortIndicatorChanged.connect(self.material_manager.model.sort)
+        self.material_manager.model.cellEdited.connect(self.on_item_changed)
+        QApplication.instance().focusChanged.connect(self.on_focus_changed)
+
+    def update_search_hint(self):
+        """Indique si la recherche porte sur une partie du texte ou, via FTS5 (grande base), sur le début des mots"""
+        if self.material_manager.word_prefix_search():
+            self.search_bar.setPlaceholderText("Rechercher un matériel (début des mots)...")
+            self.search_bar.setToolTip(
+                "Base volumineuse : recherche sur le début des mots\n"
+                "« pont » trouve « Pont-Neuf » mais pas « Dupont », « 001 » trouve « C-001 » mais pas « PC001 »"
+            )
+        else:
+            self.search_bar.setPlaceholderText("Rechercher un matériel...")
+            self.search_bar.setToolTip("Recherche d'une partie du texte : « pont » trouve « Dupont »")
 
     def load_data(self):
-        self.material_manager.load_materials()
+        # Chargement en arrière-plan : la fenêtre s'affiche sans attendre la requête
+        self.material_manager.load_materials_async()
 
     # Méthodes de gestion des matériels
     def add_material(self):
+        last_id = self.material_manager.last_material_id()
         dialog = AddItemDialog(self.session)
         if dialog.exec_():
-            self.material_manager.load_materials()
+            self.material_manager.load_materials_async(since_id=last_id)
+
+    def selected_material_ids(self):
+        """Ids des lignes sélectionnées, lus depuis les plages de sélection (pas cellule par cellule)"""
+        rows = set()
+        for selection_range in self.table_view.selectionModel().selection():
+            rows.update(range(selection_range.top(), selection_range.bottom() + 1))
+        model = self.material_manager.model
+        return [model.material_id(row) for row in sorted(rows)]
 
     def delete_selected_materials(self):
-        selected_rows = set(item.row() for item in self.table_widget.selectedItems())
-        if not selected_rows:
+        ids_to_delete = self.selected_material_ids()
+        if not ids_to_delete:
             return
         
         reply = QMessageBox.question(
             self, 
             'Confirmation', 
-            f'Voulez-vous vraiment supprimer {len(selected_rows)} matériel(s) ?',
+            f'Voulez-vous vraiment supprimer {len(ids_to_delete)} matériel(s) ?',
             QMessageBox.Yes | QMessageBox.No, 
             QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
-            ids_to_delete = [
-                self.table_widget.item(row, 0).data(Qt.UserRole)
-                for row in selected_rows
-            ]
             self.material_manager.delete_materials(ids_to_delete)
+            self.table_view.clearSelection()
+
+    def reassign_selected_materials(self, material_ids=None):
+        self.bulk_update_selected("assigned_user", "Réassigner", "Nouvel utilisateur :", material_ids)
 
-    def on_item_changed(self, item):
-        row = item.row()
-        col = item.column()
-        new_value = item.text()
-        material_id = self.table_widget.item(row, 0).data(Qt.UserRole)
+    def move_selected_materials(self, material_ids=None):
+        self.bulk_update_selected("location", "Déplacer", "Nouvelle localisation :", material_ids)
+
+    def bulk_update_selected(self, field_name, title, label, material_ids=None):
+        """Modifie un champ de toutes les lignes sélectionnées en une seule transaction"""
+        material_ids = material_ids or self.selected_material_ids()
+        if not material_ids:
+            return
+        
+        value, ok = QInputDialog.getItem(
+            self,
+            title,
+            f"{len(material_ids)} matériel(s) sélectionné(s)\n{label}",
+            distinct_values(self.session, field_name),
+            0,
+            True
+        )
+        if ok:
+            self.material_manager.update_materials(material_ids, field_name, value.strip() or None)
+
+    def on_item_changed(self, row, col, new_value):
+        material_id = self.material_manager.model.index(row, 0).data(Qt.UserRole)
         
         field_map = {
             0: "name", 1: "serial_number", 2: "category",
             3: "mac_address", 4: "brand_model", 5: "location",
-            6: "assigned_user", 8: "comments"
+            6: "assigned_user", 7: "assignment_date", 8: "comments"
         }
         
         if col in field_map:
             self.material_manager.update_material(material_id, field_map[col], new_value)
 
+    def on_focus_changed(self, old, new):
+        # Quitter la table (ou la fenêtre) écrit les modifications en attente
+        if new is None or (new is not self.table_view and not self.table_view.isAncestorOf(new)):
+            self.material_manager.flush_edits()
+
     # Import/Export
     def import_materials(self):
+        self.start_import("append")
+
+    def sync_materials(self):
+        """Import fusionné : met à jour les matériels déjà présents au lieu de les dupliquer"""
+        self.start_import("merge")
+
+    def start_import(self, mode):
         file_name, _ = QFileDialog.getOpenFileName(self, "Sélectionner le fichier CSV", "", "CSV Files (*.csv)")
-        if file_name and self.material_manager.import_materials(file_name):
-            QMessageBox.information(self, "Succès", "Import terminé avec succès!")
+        if not file_name:
+            return
+        
+        # L'import tourne dans un thread : la fenêtre reste utilisable
+        self.material_manager.flush_edits()
+        self.import_last_id = self.material_manager.last_material_id()
+        worker = ImportWorker(self.session.get_bind(), file_name, mode=mode, parent=self)
+        self.run_worker(worker, "Import CSV", "Import en cours...", self.on_import_succeeded)
+
+    def on_import_succeeded(self, result):
+        if result['updated']:
+            self.material_manager.load_materials_async()
+        else:
+            self.material_manager.load_materials_async(since_id=self.import_last_id)
+        QMessageBox.information(
+            self, "Succès",
+            f"Import terminé avec succès!\n{result['inserted']} matériel(s) ajouté(s), "
+            f"{result['updated']} mis à jour, {result['unchanged']} inchangé(s) "
+            f"({result['rows_per_second']:.0f} lignes/s)"
+        )
 
     def export_materials(self):
-        file_name, _ = QFileDialog.getSaveFileName(self, "Exporter en CSV", "", "CSV Files (*.csv)")
-        if file_name and self.material_manager.export_materials(file_name):
-            QMessageBox.information(self, "Succès", "Export terminé avec succès!")
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Exporter", "", "CSV Files (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not file_name:
+            return
+        self.material_manager.flush_edits()
+        if selected_filter.startswith("JSON") and not file_name.lower().endswith(".jsonl"):
+            file_name += ".jsonl"
+        
+        # Proposer de n'exporter que le résultat de la recherche en cours
+        where = None
+        if self.material_manager.search_text:
+            reply = QMessageBox.question(
+                self,
+                'Export',
+                'Exporter uniquement les résultats de la recherche en cours ?',
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+            if reply == QMessageBox.Yes:
+                where = self.material_manager.search_clause()
+        
+        worker = ExportWorker(self.session.get_bind(), file_name, where, parent=self)
+        self.run_worker(worker, "Export", "Export en cours...", self.on_export_succeeded)
+
+    def on_export_succeeded(self, result):
+        QMessageBox.information(
+            self, "Succès",
+            f"Export terminé avec succès!\n{result['exported']} matériel(s) exporté(s)"
+        )
+
+    def run_worker(self, worker, title, label, on_success):
+        """Lance une tâche de fond avec une boîte de progression annulable"""
+        progress = QProgressDialog(label, "Annuler", 0, 100, self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(worker.cancel)
+        
+        def on_progress(rows, percent):
+            progress.setLabelText(f"{label} {rows} lignes")
+            progress.setValue(percent)
+        
+        def on_succeeded(result):
+            progress.reset()
+            on_success(result)
+        
+        def on_cancelled():
+            progress.reset()
+            QMessageBox.information(self, title, "Opération annulée.")
+        
+        def on_failed(message):
+            progress.reset()
+            QMessageBox.critical(self, "Erreur", f"Erreur : {message}")
+        
+        worker.progress.connect(on_progress)
+        worker.succeeded.connect(on_succeeded)
+        worker.cancelled.connect(on_cancelled)
+        worker.failed.connect(on_failed)
+        worker.finished.connect(worker.deleteLater)
+        # Garder une référence tant que la tâche tourne
+        self.workers.add(worker)
+        worker.finished.connect(lambda: self.workers.discard(worker))
+        worker.start()
 
     def show_import_help(self):
         try:
+            # markdown n'est chargé qu'à la première ouverture de l'aide
+            from markdown import markdown
             with open('src/resources/import_help.md', 'r', encoding='utf-8') as file:
                 md_content = file.read()
             html_content = markdown(md_content, extensions=['fenced_code'])
@@ -137,17 +277,53 @@ class MainWindow(QMainWindow):
     # Autres fonctionnalités
     def generate_pdf(self):
         file_name, _ = QFileDialog.getSaveFileName(self, "Enregistrer le PDF", "", "PDF Files (*.pdf)")
-        if file_name:
-            try:
-                from src.utils.pdf_generator import generate_inventory_pdf
-                generate_inventory_pdf(self.material_manager.all_materials, file_name)
-                QMessageBox.information(self, "Succès", "PDF généré avec succès!")
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du PDF: {str(e)}")
+        if not file_name:
+            return
+        # Le rapport est généré par un processus séparé qui lit la base : écrire les modifications en attente
+        self.material_manager.flush_edits()
+        worker = PdfWorker(self.session.get_bind(), file_name, parent=self)
+        self.run_worker(worker, "Rapport PDF", "Génération du PDF...", self.on_pdf_succeeded)
+
+    def on_pdf_succeeded(self, result):
+        QMessageBox.information(
+            self, "Succès",
+            f"PDF généré avec succès!\n{result['exported']} matériel(s) en {result['elapsed']:.1f} s"
+        )
+
+    def generate_report_bundle(self):
+        """Un rapport PDF par localisation, catégorie ou utilisateur, dans un dossier ou une archive ZIP"""
+        from src.utils.pdf_generator import BUNDLE_GROUPINGS
+        labels = list(BUNDLE_GROUPINGS.values())
+        label, ok = QInputDialog.getItem(self, "Rapports par regroupement", "Un rapport par :", labels, 0, False)
+        if not ok:
+            return
+        field_name = list(BUNDLE_GROUPINGS)[labels.index(label)]
+        output, selected_filter = QFileDialog.getSaveFileName(
+            self, "Enregistrer les rapports", "", "Archive ZIP (*.zip);;Dossier (*)"
+        )
+        if not output:
+            return
+        if selected_filter.startswith("Archive") and not output.lower().endswith(".zip"):
+            output += ".zip"
+        self.material_manager.flush_edits()
+        worker = ReportBundleWorker(self.session.get_bind(), output, field_name, parent=self)
+        self.run_worker(worker, "Rapports PDF", "Génération des rapports...", self.on_report_bundle_succeeded)
+
+    def on_report_bundle_succeeded(self, result):
+        QMessageBox.information(
+            self, "Succès",
+            f"{result['reports']} rapport(s) généré(s) avec index.pdf\n"
+            f"{result['exported']} matériel(s) en {result['elapsed']:.1f} s"
+        )
 
     def show_dashboard(self):
-        dashboard = DashboardDialog(self.session, self)
-        dashboard.exec_()
+        # QtChart n'est chargé qu'à la première ouverture du tableau de bord
+        from src.gui.dashboard import DashboardDialog
+        self.material_manager.flush_edits()
+        # Non modal : le tableau de bord suit les modifications faites dans la table
+        dashboard = DashboardDialog(self.session, self, events=self.material_manager.events)
+        dashboard.setAttribute(Qt.WA_DeleteOnClose)
+        dashboard.show()
 
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
@@ -155,25 +331,42 @@ class MainWindow(QMainWindow):
         self.settings.setValue('dark_mode', self.dark_mode)
 
     def closeEvent(self, event):
+        # Écrire les modifications en attente puis arrêter les threads encore actifs avant de fermer la session
+        QApplication.instance().focusChanged.disconnect(self.on_focus_changed)
+        self.material_manager.flush_edits()
+        self.material_manager.save_snapshot()
+        self.material_manager.stop_loading()
+        for worker in list(self.workers):
+            worker.cancel()
+            worker.wait()
         self.session.close()
         super().closeEvent(event)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if hasattr(self, 'table_widget'):
+        if hasattr(self, 'table_view'):
             self.material_manager.adjust_columns()
 
     def show_context_menu(self, position):
         menu = QMenu()
         delete_action = menu.addAction("Supprimer")
+        menu.addSeparator()
+        reassign_action = menu.addAction("Réassigner la sélection…")
+        move_action = menu.addAction("Déplacer la sélection…")
         
         # Obtenir l'élément sélectionné
-        row = self.table_widget.rowAt(position.y())
+        row = self.table_view.rowAt(position.y())
         if row >= 0:
-            action = menu.exec_(self.table_widget.viewport().mapToGlobal(position))
-            if action == delete_action:
+            action = menu.exec_(self.table_view.viewport().mapToGlobal(position))
+            # Sans sélection, les actions groupées portent sur la ligne cliquée
+            material_ids = self.selected_material_ids() or [self.material_manager.model.material_id(row)]
+            if action == reassign_action:
+                self.reassign_selected_materials(material_ids)
+            elif action == move_action:
+                self.move_selected_materials(material_ids)
+            elif action == delete_action:
                 # Utiliser delete_materials avec une liste d'un seul ID
-                material_id = self.table_widget.item(row, 0).data(Qt.UserRole)
+                material_id = self.material_manager.model.index(row, 0).data(Qt.UserRole)
                 if QMessageBox.question(
                     self, 
                     'Confirmation', 
@@ -18,6 +18,16 @@ class ToolbarManager:
         delete_action.triggered.connect(self.main_window.delete_selected_materials)
         self.toolbar.addAction(delete_action)
         
+        reassign_action = QAction("👤 Réassigner", self.main_window)
+        reassign_action.setToolTip("Assigner les matériels sélectionnés à un utilisateur")
+        reassign_action.triggered.connect(lambda: self.main_window.reassign_selected_materials())
+        self.toolbar.addAction(reassign_action)
+        
+        move_action = QAction("📍 Déplacer", self.main_window)
+        move_action.setToolTip("Changer la localisation des matériels sélectionnés")
+        move_action.triggered.connect(lambda: self.main_window.move_selected_materials())
+        self.toolbar.addAction(move_action)
+        
         self.toolbar.addSeparator()
         
         # Groupe Import/Export
@@ -25,6 +35,11 @@ class ToolbarManager:
         import_action.triggered.connect(self.main_window.import_materials)
         self.toolbar.addAction(import_action)
         
+        sync_action = QAction("🔄 Synchroniser", self.main_window)
+        sync_action.setToolTip("Importer en mettant à jour les matériels existants (N° de série / adresse MAC)")
+        sync_action.triggered.connect(self.main_window.sync_materials)
+        self.toolbar.addAction(sync_action)
+        
         import_help_action = QAction("❓ Aide Import", self.main_window)
         import_help_action.triggered.connect(self.main_window.show_import_help)
         self.toolbar.addAction(import_help_action)
@@ -40,6 +55,11 @@ class ToolbarManager:
         pdf_action.triggered.connect(self.main_window.generate_pdf)
         self.toolbar.addAction(pdf_action)
         
+        bundle_action = QAction("🗂️ Rapports par…", self.main_window)
+        bundle_action.setToolTip("Un PDF par localisation, catégorie ou utilisateur, avec un index")
+        bundle_action.triggered.connect(self.main_window.generate_report_bundle)
+        self.toolbar.addAction(bundle_action)
+        
         stats_action = QAction("📊 Statistiques", self.main_window)
         stats_action.triggered.connect(self.main_window.show_dashboard)
         self.toolbar.addAction(stats_action)
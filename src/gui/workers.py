@@ -0,0 +1,180 @@
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from src.database.db_setup import session_factory
+from src.database.models import MaterialRecord
+from src.database.queries import material_records_statement
+from src.utils.importer import import_csv, ImportCancelled, DEFAULT_BATCH_SIZE
+from src.utils.exporter import export_materials, ExportCancelled
+from src.utils.inventory_stats import compute_statistics
+
+
+class TaskWorker(QThread):
+    """Tâche longue exécutée hors du thread graphique, avec progression et annulation.
+
+    task est appelée sans argument dans le thread ; elle signale sa progression
+    par report_progress et consulte is_cancelled.
+    """
+
+    # (lignes traitées, pourcentage)
+    progress = pyqtSignal(int, int)
+    succeeded = pyqtSignal(dict)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    # Exceptions signifiant une annulation demandée par l'utilisateur
+    cancel_exceptions = ()
+
+    def __init__(self, task, parent=None):
+        super().__init__(parent)
+        self.task = task
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        try:
+            result = self.task()
+        except self.cancel_exceptions:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(result)
+
+    def report_progress(self, rows, done, total):
+        percent = int(done * 100 / total) if total else 100
+        self.progress.emit(rows, min(percent, 100))
+
+    def report_rows(self, rows, total):
+        # Progression en lignes seulement (export, rapports)
+        self.report_progress(rows, rows, total)
+
+
+class ImportWorker(TaskWorker):
+    """Import CSV en arrière-plan"""
+
+    cancel_exceptions = (ImportCancelled,)
+
+    def __init__(self, engine, file_name, mode="append", batch_size=DEFAULT_BATCH_SIZE, parent=None):
+        super().__init__(lambda: import_csv(
+            engine,
+            file_name,
+            batch_size=batch_size,
+            progress=self.report_progress,
+            is_cancelled=self.is_cancelled,
+            mode=mode
+        ), parent)
+
+
+class ExportWorker(TaskWorker):
+    """Export CSV / JSON Lines en arrière-plan, lu directement depuis la base"""
+
+    cancel_exceptions = (ExportCancelled,)
+
+    def __init__(self, engine, file_name, where=None, parent=None):
+        super().__init__(lambda: export_materials(
+            engine,
+            file_name,
+            where=where,
+            progress=self.report_rows,
+            is_cancelled=self.is_cancelled
+        ), parent)
+
+
+def _pdf_cancel_exceptions():
+    # reportlab n'est importé qu'au premier rapport demandé, pas au démarrage
+    from src.utils.pdf_generator import PdfCancelled
+    return (PdfCancelled,)
+
+
+def _generate_pdf(engine, file_name, **options):
+    from src.utils.pdf_generator import generate_inventory_pdf_process
+    return generate_inventory_pdf_process(engine.url.render_as_string(hide_password=False), file_name, **options)
+
+
+def _generate_report_bundle(engine, output, field_name, **options):
+    from src.utils.pdf_generator import generate_report_bundle
+    return generate_report_bundle(engine.url.render_as_string(hide_password=False), output, field_name, **options)
+
+
+class PdfWorker(TaskWorker):
+    """Rapport PDF généré dans un processus séparé, lu directement depuis la base"""
+
+    def __init__(self, engine, file_name, material_ids=None, parent=None):
+        super().__init__(lambda: _generate_pdf(
+            engine,
+            file_name,
+            material_ids=material_ids,
+            progress=self.report_rows,
+            is_cancelled=self.is_cancelled
+        ), parent)
+        self.cancel_exceptions = _pdf_cancel_exceptions()
+
+
+class ReportBundleWorker(TaskWorker):
+    """Lot de rapports PDF (un par localisation, catégorie ou utilisateur) rendu par un pool de processus"""
+
+    def __init__(self, engine, output, field_name, parent=None):
+        super().__init__(lambda: _generate_report_bundle(
+            engine,
+            output,
+            field_name,
+            progress=self.report_rows,
+            is_cancelled=self.is_cancelled
+        ), parent)
+        self.cancel_exceptions = _pdf_cancel_exceptions()
+
+
+def _compute_statistics(engine):
+    with engine.connect() as connection:
+        return compute_statistics(connection)
+
+
+class StatisticsWorker(TaskWorker):
+    """Calcul des agrégats du tableau de bord en arrière-plan"""
+
+    def __init__(self, engine, parent=None):
+        super().__init__(lambda: _compute_statistics(engine), parent)
+
+
+class LoadWorker(QThread):
+    """Charge les matériels avec sa propre session et les transmet par lots d'enregistrements"""
+
+    chunk_loaded = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    # Premier lot réduit : le premier écran s'affiche immédiatement
+    FIRST_CHUNK_SIZE = 200
+    CHUNK_SIZE = 5000
+
+    def __init__(self, since_id=None, parent=None):
+        super().__init__(parent)
+        self.since_id = since_id
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        # session_factory est un scoped_session : session propre à ce thread
+        session = session_factory()
+        try:
+            statement = material_records_statement(self.since_id)
+            result = session.execute(statement.execution_options(yield_per=self.CHUNK_SIZE))
+            
+            size = self.FIRST_CHUNK_SIZE
+            while not self._cancel_event.is_set():
+                rows = result.fetchmany(size)
+                if not rows:
+                    break
+                self.chunk_loaded.emit([MaterialRecord.from_row(row) for row in rows])
+                size = self.CHUNK_SIZE
+            result.close()
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            session_factory.remove()
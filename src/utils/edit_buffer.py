@@ -0,0 +1,84 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from src.database.queries import apply_material_edits
+
+
+def _error_message(error):
+    # Première ligne seulement : sans la requête SQL ni ses paramètres
+    return str(getattr(error, "orig", None) or error).splitlines()[0]
+
+
+class EditBuffer(QObject):
+    """File d'écriture différée des modifications faites dans la table.
+
+    Les modifications d'un même matériel sont regroupées puis écrites en une
+    seule transaction, FLUSH_DELAY ms après la première modification en attente
+    (ou plus tôt via flush()). Les cellules dont l'écriture échoue sont
+    signalées par failed, avec leur valeur d'origine ; written donne le nombre
+    de lignes effectivement écrites à chaque transaction validée.
+    """
+
+    FLUSH_DELAY = 500
+
+    # Liste de (id, champ, valeur d'origine, message d'erreur)
+    failed = pyqtSignal(list)
+    written = pyqtSignal(int)
+
+    def __init__(self, session, parent=None):
+        super().__init__(parent)
+        self.session = session
+        # id -> {champ: nouvelle valeur}
+        self._pending = {}
+        # (id, champ) -> valeur avant la première modification en attente
+        self._originals = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def add(self, material_id, field_name, value, original):
+        self._pending.setdefault(material_id, {})[field_name] = value
+        self._originals.setdefault((material_id, field_name), original)
+        if not self._timer.isActive():
+            self._timer.start(self.FLUSH_DELAY)
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """Écrit les modifications en attente ; retourne False si certaines ont échoué"""
+        self._timer.stop()
+        if not self._pending:
+            return True
+        pending, originals = self._pending, self._originals
+        self._pending, self._originals = {}, {}
+
+        try:
+            written = apply_material_edits(self.session, pending)
+            self.session.commit()
+            self.written.emit(written)
+            return True
+        except Exception:
+            self.session.rollback()
+
+        # Rejouer cellule par cellule pour n'écarter que les modifications en erreur
+        failures = []
+        written = 0
+        try:
+            for material_id, fields in pending.items():
+                for field_name, value in fields.items():
+                    try:
+                        with self.session.begin_nested():
+                            written += apply_material_edits(self.session, {material_id: {field_name: value}})
+                    except Exception as e:
+                        failures.append((material_id, field_name, originals[(material_id, field_name)], _error_message(e)))
+            self.session.commit()
+            self.written.emit(written)
+        except Exception as e:
+            self.session.rollback()
+            failures = [
+                (material_id, field_name, original, _error_message(e))
+                for (material_id, field_name), original in originals.items()
+            ]
+        if not failures:
+            return True
+        self.failed.emit(failures)
+        return False
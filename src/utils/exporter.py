@@ -0,0 +1,88 @@
+import csv
+import json
+import os
+import time
+from src.database.queries import count_materials, iter_material_rows
+from src.utils.importer import CSV_COLUMNS
+
+# En-têtes du fichier CSV, dans l'ordre attendu par l'import
+CSV_HEADERS = [
+    "Nom", "Numéro de Série", "Adresse MAC", "Marque/Modèle",
+    "Catégorie", "Localisation", "Utilisateur Assigné",
+    "Date d'Assignement", "Commentaires"
+]
+EXPORT_FORMATS = ("csv", "jsonl")
+DEFAULT_BATCH_SIZE = 2000
+WRITE_BUFFER_SIZE = 1024 * 1024
+DATE_COLUMN = CSV_COLUMNS.index("assignment_date")
+
+
+class ExportCancelled(Exception):
+    """Levée lorsque l'export est annulé : le fichier partiel est supprimé"""
+
+
+def export_format_for(file_name):
+    """Déduit le format d'export de l'extension du fichier"""
+    return "jsonl" if file_name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _csv_rows(rows):
+    for row in rows:
+        values = list(row[1:])
+        date = values[DATE_COLUMN]
+        values[DATE_COLUMN] = date.strftime("%d/%m/%Y") if date else ""
+        yield [value if value is not None else "" for value in values]
+
+
+def _jsonl_lines(rows):
+    for row in rows:
+        record = dict(zip(CSV_COLUMNS, row[1:]))
+        date = record["assignment_date"]
+        record["assignment_date"] = date.date().isoformat() if date else None
+        yield json.dumps(dict(id=row[0], **record), ensure_ascii=False) + "\n"
+
+
+def export_materials(engine, file_name, export_format=None, where=None,
+                     batch_size=DEFAULT_BATCH_SIZE, progress=None, is_cancelled=None):
+    """Exporte les matériels en CSV ou JSON Lines en lisant la base par lots.
+
+    where limite l'export à une condition SQL (ex: la recherche courante,
+    voir material_search_clause). progress(lignes, total) est appelé après
+    chaque lot.
+    """
+    export_format = export_format or export_format_for(file_name)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {export_format}")
+
+    exported = 0
+    started = time.perf_counter()
+    with open(file_name, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+        try:
+            with engine.connect() as connection:
+                total = count_materials(connection, where)
+                writer = csv.writer(file) if export_format == "csv" else None
+                if writer:
+                    writer.writerow(CSV_HEADERS)
+
+                for rows in iter_material_rows(connection, CSV_COLUMNS, batch_size, where):
+                    if writer:
+                        writer.writerows(_csv_rows(rows))
+                    else:
+                        file.writelines(_jsonl_lines(rows))
+                    exported += len(rows)
+                    if progress:
+                        progress(exported, total)
+                    if is_cancelled and is_cancelled():
+                        raise ExportCancelled()
+        except BaseException:
+            # Pas de fichier tronqué en cas d'erreur ou d'annulation
+            file.close()
+            os.remove(file_name)
+            raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        'exported': exported,
+        'elapsed': elapsed,
+        'rows_per_second': exported / elapsed if elapsed else 0.0
+    }
@@ -0,0 +1,303 @@
+import csv
+import io
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import bindparam, insert, select, update
+from src.database.models import Material
+
+# Ordre des colonnes du fichier CSV (voir src/resources/import_help.md)
+CSV_COLUMNS = (
+    "name", "serial_number", "mac_address", "brand_model", "category",
+    "location", "assigned_user", "assignment_date", "comments"
+)
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')
+DEFAULT_BATCH_SIZE = 5000
+# Analyse parallèle : taille des plages et taille de fichier à partir de laquelle elle est activée
+PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+
+class ImportCancelled(Exception):
+    """Levée lorsque l'import est annulé : la transaction est annulée"""
+
+
+@lru_cache(maxsize=65536)
+def parse_date(value):
+    """Convertit une date FR (JJ/MM/AAAA) ou ISO (AAAA-MM-JJ), None si invalide.
+
+    Mémoïsée : un export contient en général peu de dates distinctes.
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    return None
+
+
+def parse_row(row):
+    """Convertit une ligne CSV en dictionnaire de colonnes, None si elle est incomplète"""
+    if len(row) < 9:
+        return None
+    return {
+        'name': row[0],
+        'serial_number': row[1] or None,
+        'mac_address': row[2] or None,
+        'brand_model': row[3] or None,
+        'category': row[4] or None,
+        'location': row[5] or None,
+        'assigned_user': row[6] or None,
+        'assignment_date': parse_date(row[7]) if row[7] else None,
+        'comments': row[8] or None
+    }
+
+
+def split_file(file_name, chunk_bytes=PARALLEL_CHUNK_BYTES):
+    """Découpe le fichier en plages d'octets alignées sur des fins de ligne.
+
+    Une frontière n'est posée qu'après un nombre pair de guillemets, pour ne
+    jamais couper un champ entre guillemets contenant un retour à la ligne.
+    """
+    ranges = []
+    start = 0
+    quotes = 0
+    with open(file_name, 'rb') as file:
+        while True:
+            block = file.read(chunk_bytes)
+            if not block:
+                break
+            quotes += block.count(b'"')
+            tail = block
+            while not (tail.endswith(b'\n') and quotes % 2 == 0):
+                tail = file.readline()
+                if not tail:
+                    break
+                quotes += tail.count(b'"')
+            end = file.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(file_name, start, end, skip_header):
+    """Lit et valide une plage d'octets du fichier (exécuté dans un processus fils)"""
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+    if skip_header:
+        next(reader, None)
+    records = []
+    for row in reader:
+        record = parse_row(row)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def _iter_serial_batches(file_name, batch_size):
+    with open(file_name, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Skip header
+
+        batch = []
+        for row in reader:
+            record = parse_row(row)
+            if record is None:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch, file.buffer.tell()
+                batch = []
+        if batch:
+            yield batch, file.buffer.tell()
+
+
+def _iter_parallel_batches(file_name, batch_size, workers):
+    ranges = split_file(file_name)
+    # "spawn" : ne pas dupliquer par fork un processus qui fait tourner Qt
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = deque()
+    try:
+        next_range = 0
+        while next_range < len(ranges) or pending:
+            # Fenêtre bornée de plages en cours pour limiter la mémoire
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                start, end = ranges[next_range]
+                pending.append((executor.submit(parse_chunk, file_name, start, end, start == 0), end))
+                next_range += 1
+
+            # Résultats consommés dans l'ordre du fichier, comme en série
+            future, end = pending.popleft()
+            records = future.result()
+            for i in range(0, len(records), batch_size):
+                yield records[i:i + batch_size], end
+    finally:
+        # Plages pas encore commencées annulées à la main : cancel_futures (shutdown) date de Python 3.9.
+        # On attend les plages déjà confiées aux processus : sous Python 3.8, wait=False ferme le canal
+        # de réveil du thread de gestion encore actif, et la sortie de l'interpréteur attend alors
+        # indéfiniment des processus qui n'ont pas reçu l'ordre de s'arrêter
+        for future, _ in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def normalize_serial(value):
+    """Numéro de série comparable : sans espaces, en majuscules"""
+    if not value:
+        return None
+    return "".join(value.split()).upper() or None
+
+
+def normalize_mac(value):
+    """Adresse MAC comparable : chiffres hexadécimaux seuls, en minuscules"""
+    if not value:
+        return None
+    digits = "".join(c for c in value.lower() if c in "0123456789abcdef")
+    if len(digits) == 12:
+        return digits
+    return "".join(value.split()).lower() or None
+
+
+class MergeWriter:
+    """Fusionne des lots de lignes avec les matériels existants.
+
+    Les lignes sont rapprochées par numéro de série puis par adresse MAC
+    normalisés : les correspondances modifiées sont mises à jour, les autres
+    sont insérées, les lignes identiques sont ignorées.
+    """
+
+    # Nombre d'ids par clause IN (sous la limite de paramètres de SQLite)
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.table = Material.__table__
+        self.counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        self.serial_ids = {}
+        self.mac_ids = {}
+
+        columns = self.table.c
+        rows = connection.execute(select(columns.id, columns.serial_number, columns.mac_address))
+        for material_id, serial_number, mac_address in rows:
+            self._register(material_id, serial_number, mac_address)
+
+        self.insert_statement = insert(self.table).returning(columns.id, sort_by_parameter_order=True)
+        self.update_statement = update(self.table).where(columns.id == bindparam('_id')).values(
+            {column: bindparam(column) for column in CSV_COLUMNS}
+        )
+
+    def write(self, records):
+        matched = {}
+        new_records = []
+        pending = {}
+        for record in records:
+            serial_key = normalize_serial(record['serial_number'])
+            mac_key = normalize_mac(record['mac_address'])
+            material_id = self.serial_ids.get(serial_key) or self.mac_ids.get(mac_key)
+            if material_id is not None:
+                matched[material_id] = record
+                continue
+
+            # Doublon dans le même lot : la dernière ligne l'emporte
+            position = pending.get(serial_key) if serial_key else None
+            if position is None and mac_key:
+                position = pending.get(mac_key)
+            if position is None:
+                position = len(new_records)
+                new_records.append(record)
+            else:
+                new_records[position] = record
+            for key in (serial_key, mac_key):
+                if key:
+                    pending[key] = position
+
+        if matched:
+            self._update(matched)
+        if new_records:
+            result = self.connection.execute(self.insert_statement, new_records)
+            for (material_id,), record in zip(result, new_records):
+                self._register(material_id, record['serial_number'], record['mac_address'])
+            self.counts['inserted'] += len(new_records)
+
+    def _update(self, matched):
+        columns = self.table.c
+        ids = list(matched)
+        changes = []
+        for i in range(0, len(ids), self.LOOKUP_CHUNK):
+            chunk = ids[i:i + self.LOOKUP_CHUNK]
+            rows = self.connection.execute(
+                select(columns.id, *(columns[name] for name in CSV_COLUMNS)).where(columns.id.in_(chunk))
+            )
+            for row in rows:
+                record = matched[row[0]]
+                self._register(row[0], record['serial_number'], record['mac_address'])
+                if all(record[name] == value for name, value in zip(CSV_COLUMNS, row[1:])):
+                    self.counts['unchanged'] += 1
+                else:
+                    changes.append(dict(record, _id=row[0]))
+        if changes:
+            self.connection.execute(self.update_statement, changes)
+            self.counts['updated'] += len(changes)
+
+    def _register(self, material_id, serial_number, mac_address):
+        serial_key = normalize_serial(serial_number)
+        if serial_key:
+            self.serial_ids[serial_key] = material_id
+        mac_key = normalize_mac(mac_address)
+        if mac_key:
+            self.mac_ids[mac_key] = material_id
+
+
+def import_csv(engine, file_name, batch_size=DEFAULT_BATCH_SIZE, progress=None, is_cancelled=None, workers=None, mode="append"):
+    """Importe un fichier CSV par lots, en streaming, dans une seule transaction.
+
+    progress(lignes, octets_lus, octets_total) est appelé après chaque lot et
+    is_cancelled() est consulté au même moment. workers > 1 active l'analyse
+    parallèle du fichier ; None la choisit automatiquement pour les gros fichiers.
+    mode="merge" met à jour les matériels existants au lieu de les dupliquer.
+    """
+    statement = insert(Material.__table__)
+    total_bytes = os.path.getsize(file_name)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if total_bytes >= PARALLEL_MIN_BYTES else 1
+    if workers > 1:
+        batches = _iter_parallel_batches(file_name, batch_size, workers)
+    else:
+        batches = _iter_serial_batches(file_name, batch_size)
+
+    processed = 0
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    started = time.perf_counter()
+
+    # Un seul écrivain : les lots validés sont insérés sur une seule connexion
+    with engine.begin() as connection:
+        merger = MergeWriter(connection) if mode == "merge" else None
+        try:
+            for batch, bytes_read in batches:
+                if merger:
+                    merger.write(batch)
+                else:
+                    connection.execute(statement, batch)
+                    counts['inserted'] += len(batch)
+                processed += len(batch)
+                if progress:
+                    progress(processed, bytes_read, total_bytes)
+                if is_cancelled and is_cancelled():
+                    raise ImportCancelled()
+        finally:
+            batches.close()
+
+    if merger:
+        counts = merger.counts
+    elapsed = time.perf_counter() - started
+    return dict(
+        counts,
+        elapsed=elapsed,
+        rows_per_second=processed / elapsed if elapsed else 0.0
+    )
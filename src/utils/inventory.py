@@ -0,0 +1,153 @@
+from datetime import datetime
+from sqlalchemy import select
+from src.database.models import Material
+from src.database.queries import (
+    bulk_delete_materials, bulk_update_materials, count_materials, get_change_version, get_max_material_id,
+    has_fulltext_search, material_search_clause
+)
+from src.utils.exporter import export_materials, ExportCancelled
+from src.utils.importer import import_csv, ImportCancelled, DEFAULT_BATCH_SIZE
+from src.utils.search_index import parse_query
+from src.utils.inventory_stats import compute_statistics
+
+
+class InventoryError(Exception):
+    """Échec d'une opération sur l'inventaire ; le message est destiné à l'utilisateur"""
+
+
+def parse_assignment_date(text):
+    """Date d'assignement saisie au format JJ/MM/AAAA ; None si le texte est vide"""
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text, '%d/%m/%Y')
+    except ValueError:
+        raise InventoryError("La date doit être au format JJ/MM/AAAA") from None
+
+
+class Inventory:
+    """Opérations sur les données de l'inventaire, sans interface graphique.
+
+    Utilisée par MaterialManager et par la ligne de commande (src.cli) : les
+    erreurs sont levées en InventoryError, à l'appelant de les présenter.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def engine(self):
+        return self.session.get_bind()
+
+    @property
+    def database_url(self):
+        """URL complète, pour les processus qui ouvrent leur propre connexion"""
+        return self.engine.url.render_as_string(hide_password=False)
+
+    # Lecture
+    def count(self):
+        return count_materials(self.session)
+
+    def last_material_id(self):
+        return get_max_material_id(self.session)
+
+    def change_version(self):
+        """(jeton, version) du compteur de modifications de la base, None s'il n'existe pas"""
+        return get_change_version(self.session)
+
+    def has_fulltext_search(self):
+        return has_fulltext_search(self.session)
+
+    def search_clause(self, search_text, use_fulltext=None):
+        """Filtre SQL d'une recherche (FTS5 si disponible, sauf use_fulltext=False)"""
+        if use_fulltext is None:
+            use_fulltext = self.has_fulltext_search()
+        return material_search_clause(parse_query(search_text), use_fulltext)
+
+    def matching_ids(self, search_text, use_fulltext=None):
+        """Ids des matériels correspondant à une recherche, appliquée par la base"""
+        statement = select(Material.id)
+        clause = self.search_clause(search_text, use_fulltext)
+        if clause is not None:
+            statement = statement.where(clause)
+        return set(self.session.execute(statement).scalars())
+
+    def statistics(self):
+        return compute_statistics(self.session)
+
+    # Écriture
+    def delete(self, material_ids):
+        """Supprime des matériels par paquets d'ids ; retourne le nombre de lignes supprimées"""
+        try:
+            deleted = bulk_delete_materials(self.session, material_ids)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise InventoryError(f"Erreur lors de la suppression: {str(e)}") from e
+        return deleted
+
+    def update(self, material_ids, field_name, new_value):
+        """Applique une même valeur à plusieurs matériels ; retourne le nombre de lignes modifiées"""
+        try:
+            updated = bulk_update_materials(self.session, material_ids, {field_name: new_value})
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise InventoryError(f"Erreur lors de la mise à jour: {str(e)}") from e
+        return updated
+
+    # Fichiers
+    def import_csv(self, file_name, mode="append", batch_size=None, workers=None,
+                   progress=None, is_cancelled=None):
+        """Import CSV par lots dans une transaction (voir importer.import_csv)"""
+        try:
+            return import_csv(
+                self.engine, file_name,
+                batch_size=batch_size or DEFAULT_BATCH_SIZE, progress=progress, is_cancelled=is_cancelled,
+                workers=workers, mode=mode
+            )
+        except ImportCancelled:
+            raise
+        except Exception as e:
+            self.session.rollback()
+            raise InventoryError(f"Erreur lors de l'import: {str(e)}") from e
+
+    def export(self, file_name, export_format=None, where=None, progress=None, is_cancelled=None):
+        """Export CSV / JSON Lines lu par lots depuis la base (voir exporter.export_materials)"""
+        try:
+            return export_materials(
+                self.engine, file_name,
+                export_format=export_format, where=where,
+                progress=progress, is_cancelled=is_cancelled
+            )
+        except ExportCancelled:
+            raise
+        except Exception as e:
+            raise InventoryError(f"Erreur lors de l'export: {str(e)}") from e
+
+    def write_pdf(self, file_name, material_ids=None, progress=None, is_cancelled=None):
+        """Rapport PDF lu par curseur dans la base (voir pdf_generator.write_inventory_pdf)"""
+        # reportlab n'est importé que si un rapport est demandé
+        from src.utils.pdf_generator import write_inventory_pdf, PdfCancelled
+        try:
+            return write_inventory_pdf(
+                self.engine, file_name,
+                material_ids=material_ids, progress=progress, is_cancelled=is_cancelled
+            )
+        except PdfCancelled:
+            raise
+        except Exception as e:
+            raise InventoryError(f"Erreur lors de la génération du PDF: {str(e)}") from e
+
+    def write_report_bundle(self, output, field_name, processes=None, progress=None, is_cancelled=None):
+        """Un rapport PDF par valeur de field_name, dans un dossier ou une archive ZIP"""
+        from src.utils.pdf_generator import generate_report_bundle, PdfCancelled
+        try:
+            return generate_report_bundle(
+                self.database_url, output, field_name,
+                processes=processes, progress=progress, is_cancelled=is_cancelled
+            )
+        except PdfCancelled:
+            raise
+        except Exception as e:
+            raise InventoryError(f"Erreur lors de la génération des rapports: {str(e)}") from e
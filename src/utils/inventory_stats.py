@@ -0,0 +1,82 @@
+from sqlalchemy import func, inspect, literal, select, text, union_all
+from sqlalchemy.orm import Session
+from src.database.migrations import SUMMARY_TABLE
+from src.database.models import Material
+
+# Regroupements du tableau de bord : clé du résultat -> colonne
+GROUPINGS = {
+    'categories': Material.category,
+    'locations': Material.location,
+    'users': Material.assigned_user,
+}
+
+
+def statistics_statement():
+    """Tous les regroupements en une seule requête (un GROUP BY par colonne indexée)"""
+    return union_all(*(
+        select(literal(key).label('grouping'), column.label('value'), func.count().label('count')).group_by(column)
+        for key, column in GROUPINGS.items()
+    ))
+
+
+def summary_statement():
+    """Mêmes lignes que statistics_statement, lues dans la table de compteurs"""
+    return text(
+        f"SELECT grouping, CASE WHEN is_null THEN NULL ELSE value END, count "
+        f"FROM {SUMMARY_TABLE} WHERE count > 0"
+    )
+
+
+def has_summary_tables(session_or_connection):
+    """Indique si la table de compteurs tenue par triggers est disponible"""
+    bind = session_or_connection.get_bind() if isinstance(session_or_connection, Session) else session_or_connection
+    return bind.dialect.name == "sqlite" and inspect(bind).has_table(SUMMARY_TABLE)
+
+
+def compute_statistics(session_or_connection, use_summary=None):
+    """Calcule les agrégats du tableau de bord en un aller-retour avec la base.
+
+    Les compteurs maintenus par triggers sont lus s'ils existent
+    (use_summary=None), sinon materials est regroupée. Retourne un
+    dictionnaire : total, assigned, unassigned et, pour categories /
+    locations / users, une liste de (valeur, nombre) triée par valeur (None
+    en tête pour les matériels sans valeur ; absente de users, comptée dans
+    unassigned).
+    """
+    if use_summary is None:
+        use_summary = has_summary_tables(session_or_connection)
+    statement = summary_statement() if use_summary else statistics_statement()
+
+    groups = {key: [] for key in GROUPINGS}
+    for grouping, value, count in session_or_connection.execute(statement):
+        groups[grouping].append((value, count))
+
+    total = sum(count for _, count in groups['categories'])
+    unassigned = sum(count for value, count in groups['users'] if value is None)
+    groups['users'] = [(value, count) for value, count in groups['users'] if value is not None]
+    for counts in groups.values():
+        counts.sort(key=lambda item: (item[0] is not None, item[0] or ""))
+
+    return dict(
+        groups,
+        total=total,
+        assigned=total - unassigned,
+        unassigned=unassigned
+    )
+
+
+def verify_summary_tables(session_or_connection):
+    """Compare les compteurs aux valeurs recalculées : liste de (regroupement, valeur, compteur, réel)"""
+    summary = compute_statistics(session_or_connection, use_summary=True)
+    actual = compute_statistics(session_or_connection, use_summary=False)
+    differences = []
+    for key in ('total', 'assigned', 'unassigned'):
+        if summary[key] != actual[key]:
+            differences.append((key, None, summary[key], actual[key]))
+    for key in GROUPINGS:
+        counted, expected = dict(summary[key]), dict(actual[key])
+        for value in sorted(counted.keys() | expected.keys(), key=lambda v: (v is not None, v or "")):
+            if counted.get(value, 0) != expected.get(value, 0):
+                differences.append((key, value, counted.get(value, 0), expected.get(value, 0)))
+    return differences
+
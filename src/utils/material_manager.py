@@ -1,176 +1,374 @@
-from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem
-from PyQt5.QtCore import Qt
-from datetime import datetime
-import csv
-from src.database.models import Material
-from src.database.queries import add_material, delete_material, update_material_field
+from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from src.database.queries import search_materials_fts
+from src.utils.inventory import Inventory, InventoryError, parse_assignment_date
+from src.gui.inventory_model import InventoryTableModel, PagedInventoryTableModel, bisect_key, insert_sorted, material_order, sort_materials
+from src.gui.workers import LoadWorker
+from src.utils.search_index import SearchIndex, parse_query
+from src.utils.edit_buffer import EditBuffer
+from src.utils.snapshot import read_snapshot, snapshot_path, write_snapshot
+
+class MaterialEvents(QObject):
+    """Changements appliqués au cache, pour les vues qui se tiennent à jour (tableau de bord)"""
+
+    added = pyqtSignal(list)
+    removed = pyqtSignal(list)
+    # Liste de (matériel, champ, ancienne valeur), le matériel portant déjà la nouvelle valeur
+    changed = pyqtSignal(list)
+    # Changements non détaillés (rechargement complet) : tout relire
+    reset = pyqtSignal()
+
 
 class MaterialManager:
-    def __init__(self, session, table_widget):
+    """Cache des matériels affichés, modèle de la table et présentation des erreurs.
+
+    Les opérations sur les données sont déléguées à Inventory (sans Qt),
+    partagée avec la ligne de commande.
+    """
+
+    # Au-delà de ce nombre de matériels, la recherche passe par FTS5 plutôt que par l'index en mémoire :
+    # elle porte alors sur le début des mots ("pont" ne trouve plus "Dupont"), voir word_prefix_search
+    FULLTEXT_THRESHOLD = 100000
+    # Au-delà de ce nombre, les matériels sont lus page par page au défilement au lieu d'être tous chargés
+    LAZY_THRESHOLD = 500000
+    # Au-delà de ce nombre de lignes ajoutées ou supprimées d'un coup, la table est reconstruite
+    DELTA_LIMIT = 1000
+    # Délai (ms) avant de réécrire l'instantané après des modifications, pour les regrouper
+    SNAPSHOT_DELAY = 2000
+
+    def __init__(self, session, table_view, search_backend=None, lazy=None):
         self.session = session
-        self.table_widget = table_widget
+        self.inventory = Inventory(session)
+        self.table_view = table_view
+        # Mode paginé : rien n'est gardé en cache, la base est interrogée au défilement
+        if lazy is None:
+            lazy = self.inventory.count() >= self.LAZY_THRESHOLD
+        self.lazy = lazy
+        if lazy:
+            self.model = PagedInventoryTableModel(session, table_view)
+        else:
+            self.model = InventoryTableModel(table_view)
+        self.table_view.setModel(self.model)
         self.materials_dict = {}
         self.all_materials = []
+        self.search_index = SearchIndex()
+        self.search_text = ""
+        # "index" (mémoire), "fts" (SQLite FTS5) ou None pour un choix automatique
+        self.search_backend = search_backend
+        self.active_search_backend = "index"
+        # Chargement en arrière-plan : seul le dernier chargement lancé est pris en compte
+        self.load_worker = None
+        self._load_generation = 0
+        self._new_materials = []
+        self.events = MaterialEvents(table_view)
+        # Modifications de cellules en attente d'écriture
+        self.edit_buffer = EditBuffer(session, table_view)
+        self.edit_buffer.failed.connect(self._on_edits_failed)
+        # Instantané du cache sur disque (voir utils.snapshot), sauf en mode paginé ou s'il est désactivé
+        self.snapshot_file = None if lazy else snapshot_path(self.inventory.engine)
+        # Version de la base (jeton, version) que reflète le cache, None si elle n'est pas garantie
+        self.snapshot_version = None
+        # Lignes écrites par l'application depuis snapshot_version
+        self._unsaved_changes = 0
+        self._snapshot_dirty = False
+        self._snapshot_timer = QTimer(table_view)
+        self._snapshot_timer.setSingleShot(True)
+        self._snapshot_timer.timeout.connect(self.save_snapshot)
+        self.edit_buffer.written.connect(self._record_changes)
 
-    def load_materials(self):
-        query = self.session.query(Material).order_by(Material.name)
-        materials = query.all()
+    def _set_materials(self, materials):
+        """Remplace tout le cache (liste triée par material_order) et l'affiche"""
+        sort_materials(materials)
         self.materials_dict = {m.id: m for m in materials}
         self.all_materials = materials
+        self.active_search_backend = self._select_search_backend(len(materials))
+        if self.active_search_backend == "index":
+            self.search_index.build(materials)
+        else:
+            self.search_index.clear()
         self.display_materials(self.all_materials)
+        self.events.reset.emit()
+
+    def load_materials_async(self, since_id=None):
+        """Charge les matériels dans un thread, par lots affichés au fil de l'eau.
+
+        Sans since_id la table est rechargée entièrement ; sinon seuls les
+        matériels d'id supérieur (ajout, import) sont chargés puis insérés.
+        """
+        self.flush_edits()
+        if self.lazy:
+            self.reload_pages()
+            return
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+            self.load_worker = None
+            # Lignes du chargement interrompu manquantes : cache à ne plus enregistrer (sauf rechargement complet)
+            self.snapshot_version = None
+        self._load_generation += 1
+        generation = self._load_generation
+        
+        if since_id is None:
+            # Instantané à jour : la table s'affiche sans requête
+            materials = self._open_snapshot()
+            if materials is not None:
+                self._set_materials(materials)
+                return
+            self.active_search_backend = self._select_search_backend(self.inventory.count())
+            self.materials_dict = {}
+            self.all_materials = []
+            self.search_index.clear()
+            self.model.set_materials(self.all_materials)
+        self._new_materials = []
+        
+        worker = LoadWorker(since_id, parent=self.table_view)
+        worker.chunk_loaded.connect(lambda chunk: self._on_chunk_loaded(generation, since_id, chunk))
+        worker.failed.connect(self._on_load_failed)
+        worker.finished.connect(lambda: self._on_load_finished(generation, since_id))
+        worker.finished.connect(worker.deleteLater)
+        self.load_worker = worker
+        worker.start()
+
+    def _on_load_failed(self, message):
+        # Cache incomplet : il ne doit pas être enregistré comme instantané
+        self.snapshot_version = None
+        QMessageBox.critical(None, "Erreur", f"Erreur lors du chargement: {message}")
+
+    def reload_pages(self):
+        """Mode paginé : relit la première page avec le filtre courant"""
+        self.model.set_filter(self._search_clause(self.search_text))
+        self.adjust_columns()
+        self.events.reset.emit()
+
+    def _search_clause(self, search_text):
+        return self.inventory.search_clause(search_text, False if self.search_backend == "index" else None)
+
+    def stop_loading(self):
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+            self.load_worker.wait()
+            self.load_worker = None
+            # Chargement interrompu : le cache est incomplet
+            self.snapshot_version = None
+
+    def _on_chunk_loaded(self, generation, since_id, chunk):
+        if generation != self._load_generation:
+            return
+        if since_id is not None:
+            # Insertion triée à la fin du chargement
+            self._new_materials.extend(chunk)
+            return
+        
+        first_chunk = not self.all_materials
+        for material in chunk:
+            self.materials_dict[material.id] = material
+            if self.active_search_backend == "index":
+                self.search_index.add(material)
+        self.all_materials.extend(chunk)
+        
+        # Avec une recherche active, le filtre est réappliqué à la fin du chargement
+        if not self.search_text:
+            self.model.append_rows(chunk)
+        if first_chunk:
+            self.adjust_columns()
+
+    def _on_load_finished(self, generation, since_id):
+        if generation != self._load_generation:
+            return
+        self.load_worker = None
+        if since_id is not None:
+            self.add_to_cache(self._new_materials)
+            self._new_materials = []
+        elif sort_materials(self.all_materials):
+            # Ordre de la base différent de material_order : lignes réaffichées triées
+            self.display_materials(self.all_materials)
+        elif self.search_text:
+            self.filter_materials(self.search_text)
+        else:
+            self.model.sort_rows()
+        if since_id is None:
+            self.events.reset.emit()
+            # Chargement complet depuis la base : instantané pour le prochain démarrage
+            self.save_snapshot()
+
+    def _select_search_backend(self, count):
+        if self.search_backend is not None:
+            return self.search_backend
+        if count >= self.FULLTEXT_THRESHOLD and self.inventory.has_fulltext_search():
+            return "fts"
+        return "index"
 
     def display_materials(self, materials):
-        self.table_widget.blockSignals(True)
-        
-        self.table_widget.setRowCount(len(materials))
-        self.table_widget.setColumnCount(9)
-        
-        self.table_widget.setHorizontalHeaderLabels([
-            "Nom", "Numéro de Série", "Catégorie", "Adresse MAC", 
-            "Marque/Modèle", "Localisation", "Utilisateur Assigné", 
-            "Date d'Assignement", "Commentaires"
-        ])
-        
-        for i, material in enumerate(materials):
-            name_item = QTableWidgetItem(material.name)
-            name_item.setData(Qt.UserRole, material.id)
-            
-            items = [
-                name_item,
-                QTableWidgetItem(str(material.serial_number or "")),
-                QTableWidgetItem(material.category or ""),
-                QTableWidgetItem(material.mac_address or ""),
-                QTableWidgetItem(material.brand_model or ""),
-                QTableWidgetItem(material.location or ""),
-                QTableWidgetItem(material.assigned_user or ""),
-                QTableWidgetItem(material.assignment_date.strftime("%d/%m/%Y") if material.assignment_date else ""),
-                QTableWidgetItem(material.comments or "")
-            ]
-            
-            for j, item in enumerate(items):
-                self.table_widget.setItem(i, j, item)
-        
-        self.table_widget.blockSignals(False)
+        self.model.set_materials(materials)
+        if self.search_text:
+            self.filter_materials(self.search_text)
         
         # Ajuster les colonnes après avoir rempli la table
         self.adjust_columns()
 
     def filter_materials(self, search_text):
-        if not search_text:
+        self.search_text = search_text
+        if self.lazy or self.active_search_backend == "fts":
+            # La recherche est faite par la base : elle doit voir les modifications en attente
+            self.flush_edits()
+        if self.lazy:
+            self.model.set_filter(self._search_clause(search_text))
+            return
+        if self.active_search_backend == "fts":
+            self.filter_materials_fulltext(search_text)
+            return
+        
+        material_ids = self.search_index.search(search_text)
+        if material_ids is None:
+            self.model.set_rows(None)
+            return
+        
+        # Conserver l'ordre d'affichage sans reparcourir tous les matériels
+        materials_dict = self.materials_dict
+        filtered_materials = sorted((materials_dict[material_id] for material_id in material_ids), key=material_order)
+        
+        self.model.set_rows(filtered_materials)
+
+    def filter_materials_fulltext(self, search_text):
+        """Recherche via la table FTS5 : résultats classés par pertinence"""
+        material_ids = search_materials_fts(self.session, parse_query(search_text))
+        if material_ids is None:
+            self.model.set_rows(None)
+            return
+        
+        materials_dict = self.materials_dict
+        self.model.set_rows([
+            materials_dict[material_id]
+            for material_id in material_ids
+            if material_id in materials_dict
+        ], ordered=False)
+
+    def add_to_cache(self, materials):
+        """Ajoute des matériels nouvellement créés au cache et à l'index de recherche"""
+        if self.lazy:
+            self.model.reset()
+            self.events.reset.emit()
+            return
+        self._record_changes(len(materials))
+        for material in materials:
+            self.materials_dict[material.id] = material
+            if self.active_search_backend == "index":
+                self.search_index.add(material)
+        if len(materials) > self.DELTA_LIMIT:
+            self.all_materials.extend(materials)
+            self.all_materials.sort(key=material_order)
             self.display_materials(self.all_materials)
+            self.events.added.emit(materials)
             return
         
-        search_text = search_text.lower()
-        filtered_materials = [
-            material for material in self.all_materials
-            if any(
-                search_text in (str(value) or "").lower()
-                for value in (
-                    material.name,
-                    material.serial_number,
-                    material.mac_address,
-                    material.brand_model,
-                    material.category,
-                    material.location,
-                    material.assigned_user,
-                    material.comments
-                )
-            )
-        ]
-        
-        self.display_materials(filtered_materials)
+        # Peu de lignes : insertion à leur place, sans redessiner la table
+        visible_ids = self._search_ids()
+        for material in materials:
+            insert_sorted(self.all_materials, material)
+            if visible_ids is None or material.id in visible_ids:
+                self.model.insert_material(material)
+        self.events.added.emit(materials)
 
     def delete_materials(self, material_ids):
+        self.flush_edits()
         try:
-            for material_id in material_ids:
-                delete_material(self.session, material_id)
-            self.session.commit()
-            
-            # Mettre à jour le cache local
-            for material_id in material_ids:
-                self.materials_dict.pop(material_id, None)
-            self.all_materials = list(self.materials_dict.values())
-            self.display_materials(self.all_materials)
-            
-            return True
-        except Exception as e:
-            self.session.rollback()
-            QMessageBox.critical(None, "Erreur", f"Erreur lors de la suppression: {str(e)}")
+            # Un DELETE par paquet d'ids plutôt qu'un chargement + suppression ORM par matériel
+            deleted = self.inventory.delete(material_ids)
+        except InventoryError as e:
+            QMessageBox.critical(None, "Erreur", str(e))
             return False
-
-    def import_materials(self, file_name):
-        try:
-            with open(file_name, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                next(reader)  # Skip header
-                
-                for row in reader:
-                    if len(row) >= 9:
-                        # Conversion de la date du format FR vers ISO
-                        assignment_date = None
-                        if row[7]:  # Si la date n'est pas vide
-                            try:
-                                assignment_date = datetime.strptime(row[7], '%d/%m/%Y')
-                            except ValueError:
-                                try:
-                                    assignment_date = datetime.strptime(row[7], '%Y-%m-%d')
-                                except ValueError:
-                                    pass
-
-                        material_data = {
-                            'name': row[0],
-                            'serial_number': row[1] or None,
-                            'mac_address': row[2] or None,
-                            'brand_model': row[3] or None,
-                            'category': row[4] or None,
-                            'location': row[5] or None,
-                            'assigned_user': row[6] or None,
-                            'assignment_date': assignment_date,
-                            'comments': row[8] or None
-                        }
-                        add_material(self.session, **material_data)
-            
-            self.session.commit()
-            self.load_materials()
+        self._record_changes(deleted)
+        
+        if self.lazy:
+            self.model.reset()
+            self.events.reset.emit()
             return True
-            
-        except Exception as e:
-            self.session.rollback()
-            QMessageBox.critical(None, "Erreur", f"Erreur lors de l'import: {str(e)}")
-            return False
+        
+        # Mettre à jour le cache local
+        removed = [self.materials_dict.pop(material_id) for material_id in material_ids if material_id in self.materials_dict]
+        for material in removed:
+            self.search_index.remove(material.id)
+        if len(removed) > self.DELTA_LIMIT:
+            # La liste est modifiée sur place : le modèle en garde une référence
+            self.all_materials[:] = [m for m in self.all_materials if m.id in self.materials_dict]
+            self.display_materials(self.all_materials)
+        else:
+            for material in removed:
+                self._discard_material(material)
+                self.model.remove_material(material)
+        self.events.removed.emit(removed)
+        return True
 
-    def export_materials(self, file_name):
+    def update_materials(self, material_ids, field_name, new_value):
+        """Applique une même valeur à plusieurs matériels (réassignation, déplacement).
+
+        field_name n'est jamais "name" : l'ordre de all_materials est inchangé.
+        """
+        self.flush_edits()
         try:
-            with open(file_name, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    "Nom", "Numéro de Série", "Adresse MAC", "Marque/Modèle",
-                    "Catégorie", "Localisation", "Utilisateur Assigné",
-                    "Date d'Assignement", "Commentaires"
-                ])
-                
-                for material in self.all_materials:
-                    writer.writerow([
-                        material.name,
-                        material.serial_number or "",
-                        material.mac_address or "",
-                        material.brand_model or "",
-                        material.category or "",
-                        material.location or "",
-                        material.assigned_user or "",
-                        material.assignment_date.strftime("%d/%m/%Y") if material.assignment_date else "",
-                        material.comments or ""
-                    ])
-                return True
-                
-        except Exception as e:
-            QMessageBox.critical(None, "Erreur", f"Erreur lors de l'export: {str(e)}")
+            updated = self.inventory.update(material_ids, field_name, new_value)
+        except InventoryError as e:
+            QMessageBox.critical(None, "Erreur", str(e))
             return False
+        self._record_changes(updated)
+        
+        if self.lazy:
+            self.model.reset()
+            self.events.reset.emit()
+            return True
+        
+        materials = [self.materials_dict[material_id] for material_id in material_ids if material_id in self.materials_dict]
+        changes = [(material, field_name, getattr(material, field_name)) for material in materials]
+        rebuild = len(materials) > self.DELTA_LIMIT
+        for material in materials:
+            if rebuild:
+                setattr(material, field_name, new_value)
+            else:
+                self.model.update_material(material, field_name, new_value)
+            if self.active_search_backend == "index":
+                self.search_index.update(material)
+        if rebuild:
+            self.display_materials(self.all_materials)
+        self.events.changed.emit(changes)
+        return True
+
+    def _discard_material(self, material):
+        """Retire un matériel de all_materials (trié par material_order) par dichotomie"""
+        materials = self.all_materials
+        position = bisect_key(materials, material_order(material))
+        if position < len(materials) and materials[position] is material:
+            del materials[position]
+
+    def _search_ids(self):
+        """Ids correspondant à la recherche courante, None sans recherche"""
+        if not self.search_text:
+            return None
+        if self.active_search_backend == "fts":
+            self.flush_edits()
+            material_ids = search_materials_fts(self.session, parse_query(self.search_text))
+            return set(material_ids) if material_ids is not None else None
+        return self.search_index.search(self.search_text)
+
+    def last_material_id(self):
+        return self.inventory.last_material_id()
+
+    def word_prefix_search(self):
+        """Vrai si la recherche passe par FTS5 : début des mots plutôt que partie du texte"""
+        if self.lazy:
+            return self.search_backend != "index" and self.inventory.has_fulltext_search()
+        return self.active_search_backend == "fts"
+
+    def search_clause(self):
+        """Condition SQL de la recherche affichée (None sans recherche), pour les traitements faits par la base"""
+        if not self.search_text:
+            return None
+        if self.lazy:
+            return self._search_clause(self.search_text)
+        return self.inventory.search_clause(self.search_text, self.active_search_backend == "fts")
 
     def adjust_columns(self):
         """Ajuste les colonnes à la taille de la fenêtre"""
-        header = self.table_widget.horizontalHeader()
-        available_width = self.table_widget.viewport().width()
+        header = self.table_view.horizontalHeader()
+        available_width = self.table_view.viewport().width()
         
         # Définir les largeurs relatives des colonnes
         column_ratios = {
@@ -189,38 +387,113 @@ class MaterialManager:
         for column, ratio in column_ratios.items():
             width = int(available_width * ratio)
             header.setSectionResizeMode(column, header.Interactive)
-            self.table_widget.setColumnWidth(column, width)
+            self.table_view.setColumnWidth(column, width)
         
         # Permettre l'étirement de la dernière colonne
         header.setStretchLastSection(True) 
 
     def update_material(self, material_id, field_name, new_value):
         """Met à jour un champ spécifique d'un matériel"""
+        # Si c'est une date, la convertir du format FR vers ISO
+        if field_name == "assignment_date":
+            try:
+                new_value = parse_assignment_date(new_value)
+            except InventoryError as e:
+                QMessageBox.warning(None, "Format de date incorrect", str(e))
+                return False
+
+        # Écriture différée : regroupée avec les modifications voisines (voir EditBuffer)
+        material = self._cached_material(material_id)
+        original = getattr(material, field_name) if material is not None else None
+        self.edit_buffer.add(material_id, field_name, new_value, original)
+        self._apply_to_cache(material_id, field_name, new_value)
+        return True
+
+    def flush_edits(self):
+        """Écrit les modifications en attente (avant toute lecture ou écriture groupée en base)"""
+        return self.edit_buffer.flush()
+
+    def _on_edits_failed(self, failures):
+        # Rétablir les valeurs d'origine des cellules non enregistrées
+        lines = []
+        for material_id, field_name, original, message in failures:
+            self._apply_to_cache(material_id, field_name, original)
+            header = InventoryTableModel.HEADERS[InventoryTableModel.FIELDS.index(field_name)]
+            lines.append(f"- Matériel {material_id}, {header} : {message}")
+        QMessageBox.critical(
+            None,
+            "Erreur",
+            "Les modifications suivantes n'ont pas pu être enregistrées :\n" + "\n".join(lines[:20])
+        )
+
+    def _cached_material(self, material_id):
+        if self.lazy:
+            return self.model.loaded_material(material_id)
+        return self.materials_dict.get(material_id)
+
+    def _apply_to_cache(self, material_id, field_name, value):
+        """Reporte une valeur sur l'enregistrement en cache et sur sa ligne"""
+        material = self._cached_material(material_id)
+        if material is None:
+            if self.lazy:
+                self.events.reset.emit()
+            return
+        change = (material, field_name, getattr(material, field_name))
+        if self.lazy:
+            self.model.update_material(material, field_name, value)
+            self.events.changed.emit([change])
+            return
+        # Un renommage déplace le matériel dans all_materials, trié par nom
+        renamed = field_name == "name"
+        if renamed:
+            self._discard_material(material)
+        self.model.update_material(material, field_name, value)
+        if renamed:
+            insert_sorted(self.all_materials, material)
+        if self.active_search_backend == "index":
+            self.search_index.update(material)
+        self.events.changed.emit([change])
+
+    # Instantané du cache (voir utils.snapshot)
+    def _open_snapshot(self):
+        """Début d'un chargement complet : retient la version de la base et lit l'instantané s'il est à jour"""
+        self._unsaved_changes = 0
+        self.snapshot_version = self.inventory.change_version() if self.snapshot_file else None
+        materials = read_snapshot(self.snapshot_file, self.snapshot_version)
+        # Chargé depuis la base : instantané à réécrire
+        self._snapshot_dirty = materials is None
+        return materials
+
+    def _record_changes(self, rows):
+        """Compte les lignes écrites par l'application et planifie la réécriture de l'instantané"""
+        if self.snapshot_version is None:
+            return
+        self._unsaved_changes += rows
+        self._snapshot_dirty = True
+        self._snapshot_timer.start(self.SNAPSHOT_DELAY)
+
+    def save_snapshot(self):
+        """Écrit l'instantané si le cache a changé et reflète exactement la base ; retourne True si écrit.
+
+        Le compteur de la base doit valoir la version du chargement plus les
+        lignes écrites depuis par l'application : tout autre écart vient d'un
+        autre processus, et l'instantané n'est plus écrit jusqu'au prochain
+        chargement complet.
+        """
+        self.flush_edits()
+        self._snapshot_timer.stop()
+        if self.snapshot_version is None or not self._snapshot_dirty or self.load_worker is not None:
+            return False
+        token, version = self.snapshot_version
+        current = self.inventory.change_version()
+        if current != (token, version + self._unsaved_changes):
+            self.snapshot_version = None
+            return False
+        self.snapshot_version, self._unsaved_changes = current, 0
         try:
-            # Si c'est une date, la convertir du format FR vers ISO
-            if field_name == "assignment_date" and new_value:
-                try:
-                    new_value = datetime.strptime(new_value, '%d/%m/%Y').date()
-                except ValueError:
-                    QMessageBox.warning(
-                        None,
-                        "Format de date incorrect",
-                        "La date doit être au format JJ/MM/AAAA"
-                    )
-                    return False
-
-            # Utiliser la fonction de queries.py
-            update_material_field(self.session, material_id, field_name, new_value)
-            self.session.commit()
-
-            # Mettre à jour le cache local
-            material = self.session.query(Material).get(material_id)
-            self.materials_dict[material_id] = material
-            self.all_materials = list(self.materials_dict.values())
-            
-            return True
-                
-        except Exception as e:
-            self.session.rollback()
-            QMessageBox.critical(None, "Erreur", f"Erreur lors de la mise à jour: {str(e)}")
-            return False
\ No newline at end of file
+            write_snapshot(self.snapshot_file, self.all_materials, current)
+        except (OSError, ValueError):
+            # Instantané facultatif : le prochain démarrage lira la base
+            return False
+        self._snapshot_dirty = False
+        return True
@@ -1,153 +1,527 @@
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable, SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from datetime import datetime
+from xml.sax.saxutils import escape
+from src.database.models import MaterialRecord, RECORD_FIELDS
+from src.database.queries import count_materials, iter_material_rows, material_partitions, partition_clause
 
-# Initialiser les styles
-styles = getSampleStyleSheet()
-
-# Définir les styles une seule fois en constantes
-HEADER_STYLE = ParagraphStyle(
-    'HeaderStyle',
-    parent=styles['Normal'],
-    fontSize=10,
-    textColor=colors.whitesmoke,
-    alignment=1,
-    spaceAfter=6,
-    spaceBefore=6,
-    leading=12
-)
-
-def generate_inventory_pdf(materials, output_file):
-    # Création du document avec des marges réduites et en mode paysage
-    doc = SimpleDocTemplate(
-        output_file,
-        pagesize=landscape(A4),
-        rightMargin=30,  # Réduire les marges
-        leftMargin=30,
-        topMargin=30,
-        bottomMargin=30
-    )
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=1  # Centre
-    )
-    
-    # Définir un style pour les cellules du tableau afin de gérer le retour à la ligne
-    cell_style = ParagraphStyle(
-        'CellStyle',
-        parent=styles['Normal'],
-        fontSize=8,
-        leading=10,
-        alignment=0  # aligner à gauche
-    )
-    
-    # Contenu du document
-    elements = []
-    
-    # Titre
-    title = Paragraph("Inventaire du Matériel", title_style)
-    elements.append(title)
-    
-    # Date de génération
-    date_style = ParagraphStyle(
-        'DateStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.gray,
-        alignment=1
-    )
-    date_text = f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}"
-    elements.append(Paragraph(date_text, date_style))
-    elements.append(Spacer(1, 20))
-    
-    # Style pour les en-têtes de colonnes
-    header_style = HEADER_STYLE
-    
-    # Données pour le tableau avec Paragraph pour les en-têtes
-    data = [[
-        Paragraph("Nom", header_style),
-        Paragraph("N° Série", header_style),
-        Paragraph("Caté-<br/>gorie", header_style),
-        Paragraph("Adresse<br/>MAC", header_style),
-        Paragraph("Marque/<br/>Modèle", header_style),
-        Paragraph("Locali-<br/>sation", header_style),
-        Paragraph("Utilisa-<br/>teur", header_style),
-        Paragraph("Date<br/>d'attrib.", header_style)
-    ]]
-    
-    for material in materials:
-        data.append([
-            Paragraph(material.name, cell_style),
-            Paragraph(material.serial_number or "", cell_style),
-            Paragraph(material.category or "", cell_style),
-            Paragraph(material.mac_address or "", cell_style),
-            Paragraph(material.brand_model or "", cell_style),
-            Paragraph(material.location or "", cell_style),
-            Paragraph(material.assigned_user or "", cell_style),
-            Paragraph(material.assignment_date.strftime("%d/%m/%Y") if material.assignment_date else "", cell_style)
+REPORT_TITLE = "Inventaire du Matériel"
+DEFAULT_BATCH_SIZE = 1000
+# Intervalle de lecture des messages du processus de génération (secondes)
+POLL_INTERVAL = 0.1
+
+# Champs selon lesquels un lot de rapports peut être découpé
+BUNDLE_GROUPINGS = {
+    "location": "Localisation",
+    "category": "Catégorie",
+    "assigned_user": "Utilisateur",
+}
+EMPTY_PARTITION_LABEL = "Non renseigné"
+INDEX_FILE_NAME = "index.pdf"
+
+
+class PdfCancelled(Exception):
+    """Levée lorsque la génération du PDF est annulée : aucun fichier n'est écrit"""
+
+
+class MaterialTable(Flowable):
+    """Tableau des matériels construit page par page au fil de la mise en page.
+
+    Les lignes sont tirées de l'itérateur rows à la demande : chaque page est
+    une Table découpée par Table.split, exactement comme le serait une Table
+    unique avec repeatRows=1, et la suite des lignes reste dans un nouveau
+    MaterialTable. La mémoire ne dépend donc pas du nombre de matériels.
+    """
+
+    # Lignes lues pour la première page, plus qu'une page n'en contient
+    PREFETCH_ROWS = 50
+    # Marge ajoutée au nombre de lignes de la page précédente
+    EXTRA_ROWS = 4
+
+    def __init__(self, header, rows, col_widths, style, pending=(), prefetch=PREFETCH_ROWS):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.style = style
+        self._pending = list(pending)
+        self._prefetch = prefetch
+        self._exhausted = False
+
+    def _fill(self, count):
+        while not self._exhausted and len(self._pending) < count:
+            row = next(self.rows, None)
+            if row is None:
+                self._exhausted = True
+            else:
+                self._pending.append(row)
+
+    def _make_table(self):
+        table = Table([self.header] + self._pending, colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.style)
+        return table
+
+    def wrap(self, availWidth, availHeight):
+        # Jamais placé tel quel : la page courante est toujours obtenue par split()
+        return availWidth, availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        count = self._prefetch
+        while True:
+            self._fill(count)
+            table = self._make_table()
+            if self._exhausted and table.wrap(availWidth, availHeight)[1] <= availHeight + rl_config._FUZZ:
+                # Dernière page : la fin du tableau est placée entière, comme par Frame.add
+                return [table]
+            parts = table.split(availWidth, availHeight)
+            if len(parts) != 1 or self._exhausted:
+                break
+            # Toutes les lignes lues tiennent sur la page : en lire davantage
+            count *= 2
+        if len(parts) < 2:
+            # Fin du tableau (ou page pleine : [] reporte à la page suivante)
+            return parts
+        first = parts[0]
+        # first contient l'en-tête suivi des premières lignes en attente
+        page_rows = first._nrows - 1
+        rest = self._pending[page_rows:]
+        return [first, MaterialTable(
+            self.header, self.rows, self.col_widths, self.style, rest, page_rows + self.EXTRA_ROWS
+        )]
+
+
+class ReportTemplate:
+    """Mise en forme du rapport, préparée une fois et réutilisée par chaque génération.
+
+    Styles, ligne d'en-tête, largeurs de colonnes et TableStyle sont créés à
+    la construction. Une cellule qui tient sur une ligne reste une chaîne,
+    dessinée directement par la Table ; seules les valeurs à couper
+    deviennent des Paragraph.
+    """
+
+    PAGE_SIZE = landscape(A4)
+    MARGIN = 30
+    # Largeurs relatives des colonnes
+    COLUMN_RATIOS = [
+        0.12,  # Nom (12%)
+        0.12,  # N° Série (12%)
+        0.11,  # Catégorie (11%)
+        0.15,  # Adresse MAC (15%)
+        0.14,  # Marque/Modèle (14%)
+        0.13,  # Localisation (13%)
+        0.12,  # Utilisateur (12%)
+        0.11   # Date d'attribution (11%)
+    ]
+    HEADERS = [
+        "Nom", "N° Série", "Caté-<br/>gorie", "Adresse<br/>MAC",
+        "Marque/<br/>Modèle", "Locali-<br/>sation", "Utilisa-<br/>teur", "Date<br/>d'attrib."
+    ]
+    CELL_FONT = 'Helvetica'
+    CELL_FONT_SIZE = 8
+    CELL_LEADING = 10
+    # Marges intérieures gauche et droite des cellules (valeur par défaut des Table)
+    CELL_PADDING = 6
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=1  # Centre
+        )
+        self.date_style = ParagraphStyle(
+            'DateStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.gray,
+            alignment=1
+        )
+        self.header_style = ParagraphStyle(
+            'HeaderStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.whitesmoke,
+            alignment=1,
+            spaceAfter=6,
+            spaceBefore=6,
+            leading=12
+        )
+        # Style des cellules à couper sur plusieurs lignes
+        self.cell_style = ParagraphStyle(
+            'CellStyle',
+            parent=styles['Normal'],
+            fontName=self.CELL_FONT,
+            fontSize=self.CELL_FONT_SIZE,
+            leading=self.CELL_LEADING,
+            alignment=0  # aligner à gauche
+        )
+        self.footer_style = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.gray,
+            alignment=1
+        )
+
+        self.width = self.PAGE_SIZE[0] - 2 * self.MARGIN
+        self.col_widths = [self.width * ratio for ratio in self.COLUMN_RATIOS]
+        self.header = [Paragraph(text, self.header_style) for text in self.HEADERS]
+        self.table_style = self._table_style()
+
+    def _table_style(self):
+        return TableStyle([
+            # Style de l'en-tête
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('TOPPADDING', (0, 0), (-1, 0), 8),  # Ajout de padding en haut
+            # Style du contenu
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 1), (-1, -1), self.CELL_FONT),
+            ('FONTSIZE', (0, 1), (-1, -1), self.CELL_FONT_SIZE),
+            # Interligne des cellules en texte simple, identique à cell_style
+            ('LEADING', (0, 1), (-1, -1), self.CELL_LEADING),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+            # Bordures
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+            # Alternance des couleurs des lignes
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f6fa')]),
+            # Gestion du texte long
+            ('WORDWRAP', (0, 0), (-1, -1), True),
         ])
-    
-    # Définir les largeurs relatives des colonnes (ajustées)
-    col_widths = [
-        doc.width * p for p in [
-            0.12,  # Nom (12%)
-            0.12,  # N° Série (12%)
-            0.11,  # Catégorie (11%)
-            0.15,  # Adresse MAC (15%)
-            0.14,  # Marque/Modèle (14%)
-            0.13,  # Localisation (13%)
-            0.12,  # Utilisateur (12%)
-            0.11   # Date d'attribution (11%)
+
+    def document(self, output_file):
+        # Création du document avec des marges réduites et en mode paysage
+        return SimpleDocTemplate(
+            output_file,
+            pagesize=self.PAGE_SIZE,
+            rightMargin=self.MARGIN,
+            leftMargin=self.MARGIN,
+            topMargin=self.MARGIN,
+            bottomMargin=self.MARGIN
+        )
+
+    def title_elements(self, title):
+        """Titre et date de génération"""
+        date_text = f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}"
+        return [Paragraph(escape(title), self.title_style), Paragraph(date_text, self.date_style), Spacer(1, 20)]
+
+    def footer_elements(self):
+        return [Spacer(1, 20), Paragraph("Document généré par GestCharge V1.1.1", self.footer_style)]
+
+    def cell(self, text, col_width):
+        """Chaîne si le texte tient sur une ligne d'une colonne de cette largeur, Paragraph sinon"""
+        if not text:
+            return ""
+        if "\n" not in text and stringWidth(text, self.CELL_FONT, self.CELL_FONT_SIZE) <= col_width - 2 * self.CELL_PADDING:
+            return text
+        return Paragraph(escape(text), self.cell_style)
+
+    def material_row(self, material):
+        cell, widths = self.cell, self.col_widths
+        return [
+            cell(material.name, widths[0]),
+            cell(material.serial_number, widths[1]),
+            cell(material.category, widths[2]),
+            cell(material.mac_address, widths[3]),
+            cell(material.brand_model, widths[4]),
+            cell(material.location, widths[5]),
+            cell(material.assigned_user, widths[6]),
+            cell(material.assignment_date.strftime("%d/%m/%Y") if material.assignment_date else "", widths[7])
         ]
-    ]
-    
-    # Création du tableau avec les largeurs définies
+
+    def material_table(self, materials):
+        """Tableau des matériels ; les lignes ne sont créées qu'au moment d'être placées"""
+        rows = (self.material_row(material) for material in materials)
+        return MaterialTable(self.header, rows, self.col_widths, self.table_style)
+
+
+_template = None
+
+
+def report_template():
+    """Gabarit partagé par les générations du processus, créé à la première utilisation"""
+    global _template
+    if _template is None:
+        _template = ReportTemplate()
+    return _template
+
+
+def generate_inventory_pdf(materials, output_file, title=REPORT_TITLE):
+    """Génère le rapport d'inventaire ; materials peut être un itérable parcouru au fil des pages"""
+    template = report_template()
+    elements = template.title_elements(title)
+    elements.append(template.material_table(materials))
+    elements.extend(template.footer_elements())
+    template.document(output_file).build(elements)
+
+
+def write_inventory_pdf(engine, output_file, material_ids=None, batch_size=DEFAULT_BATCH_SIZE,
+                        progress=None, is_cancelled=None, where=None, title=REPORT_TITLE):
+    """Génère le rapport en lisant la base par curseur, sans charger tous les matériels.
+
+    Le PDF est écrit dans un fichier temporaire puis renommé : un rapport
+    annulé ou en erreur ne laisse aucun fichier partiel. material_ids (ou le
+    filtre SQL where) limite le rapport ; progress(lignes, total) est appelé
+    après chaque lot placé dans le document.
+    """
+    started = time.perf_counter()
+    temporary_file = output_file + ".part"
+    written = 0
+
+    with engine.connect() as connection:
+        total = len(material_ids) if material_ids is not None else count_materials(connection, where)
+
+        def materials():
+            nonlocal written
+            for rows in iter_material_rows(connection, RECORD_FIELDS[1:], batch_size, where):
+                if material_ids is not None:
+                    rows = [row for row in rows if row[0] in material_ids]
+                for row in rows:
+                    yield MaterialRecord.from_row(row)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+                if is_cancelled and is_cancelled():
+                    raise PdfCancelled()
+
+        try:
+            generate_inventory_pdf(materials(), temporary_file, title)
+            os.replace(temporary_file, output_file)
+        except BaseException:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+            raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        'exported': written,
+        'elapsed': elapsed,
+        'rows_per_second': written / elapsed if elapsed else 0.0
+    }
+
+
+def _pdf_process(database_url, output_file, material_ids, messages):
+    """Point d'entrée du processus de génération : résultat et progression passent par messages"""
+    from src.database.db_setup import create_database_engine
+
+    engine = create_database_engine(database_url)
+    try:
+        result = write_inventory_pdf(
+            engine,
+            output_file,
+            material_ids=material_ids,
+            progress=lambda rows, total: messages.put(("progress", rows, total))
+        )
+    except Exception as e:
+        messages.put(("failed", str(e)))
+    else:
+        messages.put(("succeeded", result))
+    finally:
+        engine.dispose()
+
+
+def generate_inventory_pdf_process(database_url, output_file, material_ids=None, progress=None, is_cancelled=None):
+    """Génère le rapport dans un processus séparé (mise en page hors de l'application).
+
+    Mêmes paramètres que write_inventory_pdf, la base étant désignée par son
+    URL. L'annulation arrête le processus ; PdfCancelled est alors levée.
+    """
+    context = multiprocessing.get_context("spawn")
+    messages = context.Queue()
+    process = context.Process(
+        target=_pdf_process,
+        args=(database_url, output_file, material_ids, messages),
+        daemon=True
+    )
+    process.start()
+    try:
+        while True:
+            if is_cancelled and is_cancelled():
+                raise PdfCancelled()
+            try:
+                message = messages.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not process.is_alive() and messages.empty():
+                    raise RuntimeError(f"Le processus de génération du PDF s'est arrêté (code {process.exitcode})")
+                continue
+            kind = message[0]
+            if kind == "progress":
+                if progress:
+                    progress(*message[1:])
+            elif kind == "failed":
+                raise RuntimeError(message[1])
+            else:
+                process.join()
+                return message[1]
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        # Fichier temporaire d'un processus interrompu
+        if os.path.exists(output_file + ".part"):
+            os.remove(output_file + ".part")
+
+
+# Moteur de base de données d'un processus du pool de generate_report_bundle
+_bundle_engine = None
+
+
+def _init_bundle_process(database_url):
+    global _bundle_engine
+    from src.database.db_setup import create_database_engine
+
+    _bundle_engine = create_database_engine(database_url)
+
+
+def _render_partition(task):
+    field_name, value, title, output_file = task
+    result = write_inventory_pdf(_bundle_engine, output_file, where=partition_clause(field_name, value), title=title)
+    return value, result
+
+
+def _partition_label(value):
+    return value if value not in (None, "") else EMPTY_PARTITION_LABEL
+
+
+def _partition_file_names(values):
+    """Nom de fichier unique (sans distinction de casse) pour chaque valeur de partition"""
+    used = {INDEX_FILE_NAME.lower()}
+    names = {}
+    for value in values:
+        base = re.sub(r"[^\w-]+", "_", value or "").strip("_")[:80] or "non_renseigne"
+        name, suffix = f"{base}.pdf", 2
+        while name.lower() in used:
+            name, suffix = f"{base}_{suffix}.pdf", suffix + 1
+        used.add(name.lower())
+        names[value] = name
+    return names
+
+
+def _write_bundle_index(entries, output_file, field_name):
+    """Index du lot : une ligne (valeur, nombre de matériels, fichier) par rapport"""
+    label = BUNDLE_GROUPINGS[field_name]
+    template = report_template()
+    header = [Paragraph(text, template.header_style) for text in (label, "Matériels", "Fichier")]
+    col_widths = [template.width * ratio for ratio in (0.5, 0.15, 0.35)]
+    data = [header]
+    for value, count, file_name in entries:
+        data.append([template.cell(_partition_label(value), col_widths[0]), str(count), template.cell(file_name, col_widths[2])])
+    data.append(["Total", str(sum(count for _, count, _ in entries)), ""])
+
     table = Table(data, colWidths=col_widths, repeatRows=1)
-    table.setStyle(TableStyle([
-        # Style de l'en-tête
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),  # Ajout de padding en haut
-        # Style du contenu
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        # Bordures
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
-        # Alternance des couleurs des lignes
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f6fa')]),
-        # Gestion du texte long
-        ('WORDWRAP', (0, 0), (-1, -1), True),
-    ]))
-    
+    table.setStyle(template.table_style)
+    table.setStyle([('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')])
+    elements = template.title_elements(f"Index des rapports par {label.lower()}")
     elements.append(table)
-    
-    # Ajout du pied de page
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.gray,
-        alignment=1
+    elements.extend(template.footer_elements())
+    template.document(output_file).build(elements)
+
+
+def generate_report_bundle(database_url, output, field_name, processes=None, progress=None, is_cancelled=None):
+    """Génère un rapport PDF par valeur de field_name (location, category ou assigned_user).
+
+    Les partitions sont lues par un GROUP BY puis rendues en parallèle par un
+    pool de processus (un par cœur par défaut), les plus grosses en premier.
+    Les rapports et un index.pdf sont écrits dans le dossier output, ou dans
+    une archive ZIP si output se termine par .zip. progress(lignes, total)
+    est appelé à chaque rapport terminé ; l'annulation arrête le pool et
+    lève PdfCancelled sans laisser de fichier.
+    """
+    if field_name not in BUNDLE_GROUPINGS:
+        raise ValueError(f"Regroupement inconnu : {field_name}")
+    from src.database.db_setup import create_database_engine
+
+    started = time.perf_counter()
+    engine = create_database_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            partitions = material_partitions(connection, field_name)
+    finally:
+        engine.dispose()
+    total = sum(count for _, count in partitions)
+    counts = dict(partitions)
+    file_names = _partition_file_names(value for value, _ in partitions)
+
+    # Rendu dans un dossier temporaire voisin : rien n'apparaît avant la fin
+    output = os.path.abspath(output)
+    work_dir = tempfile.mkdtemp(prefix=".rapports-", dir=os.path.dirname(output))
+    label = BUNDLE_GROUPINGS[field_name]
+    tasks = [
+        (field_name, value, f"{REPORT_TITLE} – {label} : {_partition_label(value)}", os.path.join(work_dir, file_names[value]))
+        for value, _ in sorted(partitions, key=lambda partition: -partition[1])
+    ]
+
+    processes = max(1, min(processes or os.cpu_count() or 1, len(tasks)))
+    pool = multiprocessing.get_context("spawn").Pool(
+        processes, initializer=_init_bundle_process, initargs=(database_url,)
     )
-    elements.append(Spacer(1, 20))
-    elements.append(Paragraph("Document généré par GestCharge V1.1.1", footer_style))
-    
-    # Génération du PDF
-    doc.build(elements)
+    written = 0
+    try:
+        results = pool.imap_unordered(_render_partition, tasks)
+        for _ in tasks:
+            while True:
+                if is_cancelled and is_cancelled():
+                    raise PdfCancelled()
+                try:
+                    value, result = results.next(timeout=POLL_INTERVAL)
+                    break
+                except multiprocessing.TimeoutError:
+                    continue
+            written += result['exported']
+            if progress:
+                progress(written, total)
+        pool.close()
+
+        _write_bundle_index(
+            [(value, counts[value], file_names[value]) for value, _ in partitions],
+            os.path.join(work_dir, INDEX_FILE_NAME),
+            field_name
+        )
+        file_list = [INDEX_FILE_NAME] + [file_names[value] for value, _ in partitions]
+        if output.lower().endswith(".zip"):
+            # Les PDF sont déjà compressés : archive sans recompression
+            with zipfile.ZipFile(output + ".part", "w", zipfile.ZIP_STORED) as archive:
+                for name in file_list:
+                    archive.write(os.path.join(work_dir, name), name)
+            os.replace(output + ".part", output)
+        else:
+            os.makedirs(output, exist_ok=True)
+            for name in file_list:
+                os.replace(os.path.join(work_dir, name), os.path.join(output, name))
+    except BaseException:
+        pool.terminate()
+        if os.path.exists(output + ".part"):
+            os.remove(output + ".part")
+        raise
+    finally:
+        pool.join()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'reports': len(partitions),
+        'exported': written,
+        'processes': processes,
+        'elapsed': elapsed,
+        'rows_per_second': written / elapsed if elapsed else 0.0
+    }
@@ -0,0 +1,159 @@
+import re
+from src.database.models import SEARCHABLE_FIELDS, fold_text
+
+# Champs indexés pour la recherche
+SEARCH_FIELDS = SEARCHABLE_FIELDS
+
+# Préfixes acceptés pour restreindre la recherche à un champ (ex: "user:dupont")
+FIELD_ALIASES = {
+    "nom": "name", "name": "name",
+    "serie": "serial_number", "série": "serial_number", "serial": "serial_number", "sn": "serial_number",
+    "mac": "mac_address",
+    "marque": "brand_model", "modele": "brand_model", "modèle": "brand_model", "brand": "brand_model",
+    "categorie": "category", "catégorie": "category", "category": "category", "cat": "category",
+    "lieu": "location", "localisation": "location", "location": "location", "site": "location",
+    "user": "assigned_user", "utilisateur": "assigned_user",
+    "commentaire": "comments", "commentaires": "comments", "comments": "comments",
+}
+
+_SCOPED_TERM = re.compile(r'(\w+):("[^"]*"|\S+)')
+
+
+def parse_query(search_text):
+    """Découpe une recherche en termes (champ ou None, texte en minuscules)"""
+    terms = []
+
+    def scoped(match):
+        field = FIELD_ALIASES.get(match.group(1).lower())
+        if field is None:
+            return match.group(0)
+        value = match.group(2).strip('"').lower()
+        if value:
+            terms.append((field, value))
+        return " "
+
+    remainder = _SCOPED_TERM.sub(scoped, search_text)
+    if terms:
+        remainder = " ".join(remainder.split())
+    remainder = remainder.strip().lower()
+    if remainder:
+        # Le texte libre reste une recherche de sous-chaîne sur tous les champs
+        terms.append((None, remainder))
+    return terms
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Index inversé de trigrammes sur les champs des matériels"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # champ -> trigramme -> ids
+        self._postings = {field: {} for field in SEARCH_FIELDS}
+        # champ -> valeur de moins de 3 caractères -> ids
+        self._short_values = {field: {} for field in SEARCH_FIELDS}
+        # id -> textes indexés (fold_text), dans l'ordre de SEARCH_FIELDS
+        self._texts = {}
+
+    def build(self, materials):
+        self.clear()
+        for material in materials:
+            self.add(material)
+
+    def add(self, material):
+        texts = tuple(
+            fold_text(str(value)) if value is not None else ""
+            for value in (getattr(material, field) for field in SEARCH_FIELDS)
+        )
+        self._texts[material.id] = texts
+        for field, text in zip(SEARCH_FIELDS, texts):
+            if len(text) < 3:
+                if text:
+                    self._short_values[field].setdefault(text, set()).add(material.id)
+                continue
+            postings = self._postings[field]
+            for gram in trigrams(text):
+                postings.setdefault(gram, set()).add(material.id)
+
+    def remove(self, material_id):
+        texts = self._texts.pop(material_id, None)
+        if texts is None:
+            return
+        for field, text in zip(SEARCH_FIELDS, texts):
+            if len(text) < 3:
+                if text:
+                    self._discard(self._short_values[field], text, material_id)
+                continue
+            postings = self._postings[field]
+            for gram in trigrams(text):
+                self._discard(postings, gram, material_id)
+
+    def update(self, material):
+        self.remove(material.id)
+        self.add(material)
+
+    def search(self, search_text):
+        """Retourne les ids correspondant à la recherche, ou None si elle est vide"""
+        terms = parse_query(search_text)
+        if not terms:
+            return None
+
+        result = None
+        for field, term in terms:
+            term = fold_text(term)
+            fields = SEARCH_FIELDS if field is None else (field,)
+            matches = set()
+            for name in fields:
+                matches |= self._match(name, term)
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result
+
+    def _match(self, field, term):
+        postings = self._postings[field]
+
+        if len(term) < 3:
+            # Terme court : union des trigrammes et des valeurs courtes qui le contiennent
+            matches = set()
+            for gram, ids in postings.items():
+                if term in gram:
+                    matches |= ids
+            for value, ids in self._short_values[field].items():
+                if term in value:
+                    matches |= ids
+            return matches
+
+        # Intersection des listes, de la plus courte à la plus longue
+        lists = []
+        for gram in trigrams(term):
+            ids = postings.get(gram)
+            if not ids:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            candidates &= ids
+            if not candidates:
+                return candidates
+
+        # Vérification finale : les trigrammes doivent se suivre dans le texte
+        position = SEARCH_FIELDS.index(field)
+        return {
+            material_id for material_id in candidates
+            if term in self._texts[material_id][position]
+        }
+
+    @staticmethod
+    def _discard(mapping, key, material_id):
+        ids = mapping.get(key)
+        if ids is not None:
+            ids.discard(material_id)
+            if not ids:
+                del mapping[key]
@@ -0,0 +1,184 @@
+"""Instantané sur disque des matériels affichés, pour afficher la table sans requête au démarrage.
+
+Fichier binaire en colonnes : un en-tête JSON (jeton et version du compteur
+de modifications de la base, nombre de lignes, emplacement des sections)
+puis les sections de chaque champ de MaterialRecord, lues par mmap.
+L'instantané n'est utilisé que si sa version est celle de la base.
+"""
+import gc
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from operator import attrgetter
+from src.database.db_setup import load_config
+from src.database.models import MaterialRecord, RECORD_FIELDS, INTERNED_FIELDS
+
+MAGIC = b"GCSNAP01"
+# Signature puis longueur de l'en-tête JSON
+PREAMBLE = struct.Struct("<8sI")
+# Chaque section commence sur un multiple de 8 octets
+ALIGNMENT = 8
+SEPARATOR = "\0"
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+# Dates en microsecondes depuis EPOCH ; valeur réservée aux dates absentes
+NULL_DATE = -2 ** 63
+
+# Champ -> encodage : entiers, dates, valeurs répétées (dictionnaire + codes) ou texte
+COLUMN_KINDS = {
+    field: "int" if field == "id"
+    else "date" if field == "assignment_date"
+    else "dict" if field in INTERNED_FIELDS
+    else "text"
+    for field in RECORD_FIELDS
+}
+
+
+def snapshot_path(database_engine, config=None):
+    """Fichier d'instantané d'une base SQLite ; None si désactivé (section [snapshot]) ou base en mémoire"""
+    config = config if config is not None else load_config()
+    if not config.getboolean("snapshot", "enabled", fallback=True):
+        return None
+    url = database_engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return config.get("snapshot", "path", fallback=None) or url.database + ".snapshot"
+
+
+# Encodage : liste de sections (octets) par colonne
+def _encode_text(values):
+    # Valeurs séparées par NUL, et un octet par ligne (1 = None) si des valeurs manquent
+    text = SEPARATOR.join(value or "" for value in values)
+    if text.count(SEPARATOR) != max(len(values) - 1, 0):
+        raise ValueError("Valeur contenant le séparateur de l'instantané")
+    nulls = bytes(value is None for value in values) if None in values else b""
+    return [text.encode("utf-8"), nulls]
+
+
+def _encode_column(kind, values):
+    if kind == "int":
+        return [array("q", values).tobytes()]
+    if kind == "date":
+        return [array("q", (
+            NULL_DATE if value is None else (value - EPOCH) // ONE_MICROSECOND for value in values
+        )).tobytes()]
+    if kind == "dict":
+        codes = {}
+        column = array("i", (-1 if value is None else codes.setdefault(value, len(codes)) for value in values))
+        return _encode_text(list(codes))[:1] + [column.tobytes()]
+    return _encode_text(values)
+
+
+# Décodage : liste des valeurs d'une colonne
+def _decode_text(data, nulls, count):
+    if not count:
+        return []
+    values = data.decode("utf-8").split(SEPARATOR)
+    if len(values) != count:
+        raise ValueError("Colonne de texte incomplète")
+    if nulls:
+        return [None if null else value for value, null in zip(values, nulls)]
+    return values
+
+
+def _decode_column(kind, sections, count, size):
+    if kind == "int":
+        return array("q", sections[0]).tolist()
+    if kind == "date":
+        return [None if value == NULL_DATE else EPOCH + value * ONE_MICROSECOND for value in array("q", sections[0])]
+    if kind == "dict":
+        # Une seule chaîne par valeur, comme MaterialRecord.from_row ; le code -1 désigne None (dernière entrée)
+        table = [sys.intern(value) for value in _decode_text(sections[0], b"", size)]
+        table.append(None)
+        return [table[code] for code in array("i", sections[1])]
+    return _decode_text(sections[0], sections[1], count)
+
+
+def write_snapshot(path, materials, version):
+    """Écrit l'instantané des matériels, dans l'ordre donné, pour la version (jeton, version) de la base.
+
+    Le fichier est écrit à côté puis renommé : un instantané interrompu ne
+    remplace jamais le précédent.
+    """
+    token, number = version
+    columns, sections, offset = {}, [], 0
+    for field in RECORD_FIELDS:
+        kind = COLUMN_KINDS[field]
+        values = list(map(attrgetter(field), materials))
+        column = {"kind": kind, "sections": []}
+        if kind == "dict":
+            column["size"] = len(set(values) - {None})
+        for section in _encode_column(kind, values):
+            column["sections"].append([offset, len(section)])
+            section += b"\0" * (-len(section) % ALIGNMENT)
+            sections.append(section)
+            offset += len(section)
+        columns[field] = column
+
+    header = json.dumps({
+        "token": token,
+        "version": number,
+        "count": len(materials),
+        "byteorder": sys.byteorder,
+        "columns": columns,
+    }).encode("utf-8")
+    header += b" " * (-(PREAMBLE.size + len(header)) % ALIGNMENT)
+
+    temporary_path = path + ".part"
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(PREAMBLE.pack(MAGIC, len(header)))
+            file.write(header)
+            file.writelines(sections)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def read_snapshot(path, version):
+    """Matériels de l'instantané s'il a été écrit pour version (jeton, version) ; None sinon.
+
+    Un fichier absent, d'une autre version ou illisible n'est pas une
+    erreur : l'appelant charge alors les matériels depuis la base.
+    """
+    if version is None:
+        return None
+    # Des centaines de milliers d'objets créés sans rien à libérer : le
+    # ramasse-miettes, déclenché par les allocations, doublerait la durée
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _read_snapshot(path, version)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _read_snapshot(path, version):
+    try:
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, header_size = PREAMBLE.unpack_from(data)
+            if magic != MAGIC:
+                return None
+            header = json.loads(data[PREAMBLE.size:PREAMBLE.size + header_size])
+            if [header["token"], header["version"]] != list(version) or header["byteorder"] != sys.byteorder:
+                return None
+            start = PREAMBLE.size + header_size
+            count = header["count"]
+            columns = []
+            for field in RECORD_FIELDS:
+                column = header["columns"][field]
+                sections = [data[start + offset:start + offset + size] for offset, size in column["sections"]]
+                values = _decode_column(column["kind"], sections, count, column.get("size", 0))
+                if len(values) != count:
+                    return None
+                columns.append(values)
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
+    return [MaterialRecord(*values) for values in zip(*columns)]
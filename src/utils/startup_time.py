@@ -0,0 +1,125 @@
+"""Budget de temps de démarrage de l'interface, mesuré avec python -X importtime.
+
+    python -m src.utils.startup_time [--budget-ms 550] [--runs 5]
+
+Chaque mesure importe la fenêtre principale dans un nouvel interpréteur.
+Échoue (code 1) si la médiane dépasse le budget ou si un module différé
+(QtChart, markdown, reportlab) est chargé avant le premier affichage.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+STARTUP_MODULE = "src.gui.main_window"
+DEFAULT_BUDGET_MS = 550
+DEFAULT_RUNS = 5
+# Modules chargés à la première utilisation seulement (tableau de bord, aide, rapports PDF)
+DEFERRED_MODULES = ("PyQt5.QtChart", "markdown", "reportlab")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# import time: self [us] | cumulative | imported package (indenté selon la profondeur)
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_imports(module=STARTUP_MODULE):
+    """Importe module dans un nouvel interpréteur.
+
+    Retourne une liste de (nom, profondeur, propre, cumulé), durées en
+    microsecondes, dans l'ordre où -X importtime les affiche.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible :\n{completed.stderr.strip().splitlines()[-1]}")
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def deferred_imports(imports):
+    """Modules différés (parmi DEFERRED_MODULES) chargés dans une mesure"""
+    return sorted({
+        deferred for name, _, _, _ in imports
+        for deferred in DEFERRED_MODULES
+        if name == deferred or name.startswith(deferred + ".")
+    })
+
+
+def module_subtree(imports, module):
+    """Imports faits par module (ses lignes précèdent la sienne, jusqu'à l'import de niveau 0 précédent)"""
+    end = next(i for i, (name, depth, _, _) in enumerate(imports) if name == module and depth == 0)
+    start = end
+    while start > 0 and imports[start - 1][1] > 0:
+        start -= 1
+    return imports[start:end + 1]
+
+
+def slowest_imports(imports, depth=2):
+    """Arbre des imports jusqu'à depth niveaux, les plus lents d'abord : liste de (nom, niveau, ms)"""
+    def children(start, end, level):
+        # Les enfants d'un import le précèdent : chaque entrée de ce niveau clôt son sous-arbre
+        nodes, first = [], start
+        for i in range(start, end):
+            name, node_level, _, cumulative = imports[i]
+            if node_level == level:
+                nodes.append((cumulative, name, first, i))
+                first = i + 1
+        rows = []
+        for cumulative, name, first, last in sorted(nodes, key=lambda node: -node[0]):
+            rows.append((name, level, cumulative / 1000))
+            if level < depth:
+                rows.extend(children(first, last, level + 1))
+        return rows
+    return children(0, len(imports) - 1, 1)
+
+
+def check_startup(module=STARTUP_MODULE, budget_ms=DEFAULT_BUDGET_MS, runs=DEFAULT_RUNS, depth=2):
+    """Mesure runs démarrages : dictionnaire median_ms, runs_ms, budget_ms, slowest, deferred, ok"""
+    measures = [module_subtree(measure_imports(module), module) for _ in range(runs)]
+    totals = [imports[-1][3] / 1000 for imports in measures]
+    median_ms = statistics.median(totals)
+    median_imports = measures[totals.index(sorted(totals)[(len(totals) - 1) // 2])]
+    deferred = sorted({name for imports in measures for name in deferred_imports(imports)})
+    return dict(
+        median_ms=median_ms,
+        runs_ms=totals,
+        budget_ms=budget_ms,
+        slowest=slowest_imports(median_imports, depth),
+        deferred=deferred,
+        ok=median_ms <= budget_ms and not deferred
+    )
+
+
+def main(argv=None):
+    """Vérifie le budget de démarrage de la fenêtre principale"""
+    parser = argparse.ArgumentParser(description="Budget de temps d'import au démarrage")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help=f"par défaut : {DEFAULT_BUDGET_MS} ms")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"mesures (médiane), par défaut : {DEFAULT_RUNS}")
+    parser.add_argument("--top", type=int, default=15, help="lignes de l'arbre des imports à afficher")
+    parser.add_argument("--depth", type=int, default=2, help="niveaux d'imports détaillés (par défaut : 2)")
+    parser.add_argument("--module", default=STARTUP_MODULE, help=f"module mesuré (par défaut : {STARTUP_MODULE})")
+    args = parser.parse_args(argv)
+
+    result = check_startup(args.module, args.budget_ms, max(args.runs, 1), args.depth)
+    print(f"Import de {args.module} : {result['median_ms']:.0f} ms (médiane de "
+          f"{', '.join(f'{ms:.0f}' for ms in result['runs_ms'])}), budget {result['budget_ms']:.0f} ms")
+    for name, level, ms in result['slowest'][:args.top]:
+        print(f"  {ms:8.1f} ms  {'  ' * (level - 1)}{name}")
+    if result['deferred']:
+        print(f"Modules différés chargés au démarrage : {', '.join(result['deferred'])}")
+    if result['median_ms'] > result['budget_ms']:
+        print("Budget de démarrage dépassé")
+    return 0 if result['ok'] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,12 @@
 from PyQt5.QtGui import QPalette, QColor
 from PyQt5.QtCore import Qt, QFile, QTextStream
-from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWidgets import QApplication, QWidget
 
 class ThemeManager:
     def __init__(self):
         self.light_palette = QPalette()
         self.dark_palette = self._create_dark_palette()
+        self._style_sheet = None
         
     def _create_dark_palette(self):
         palette = QPalette()
@@ -24,12 +25,16 @@ class ThemeManager:
         palette.setColor(QPalette.HighlightedText, QColor(35, 35, 35))
         return palette
 
+    def style_sheet(self):
+        """Feuille de style de l'application, lue une seule fois"""
+        if self._style_sheet is None:
+            style_file = QFile("src/resources/styles.qss")
+            style_file.open(QFile.ReadOnly | QFile.Text)
+            self._style_sheet = QTextStream(style_file).readAll()
+            style_file.close()
+        return self._style_sheet
+
     def apply_theme(self, window, is_dark_mode):
-        # Charger le fichier de style
-        style_file = QFile("src/resources/styles.qss")
-        style_file.open(QFile.ReadOnly | QFile.Text)
-        style_sheet = QTextStream(style_file).readAll()
-        
         if is_dark_mode:
             QApplication.setPalette(self.dark_palette)
             window.theme_action.setText("☼")
@@ -38,7 +43,18 @@ class ThemeManager:
             QApplication.setPalette(self.light_palette)
             window.theme_action.setText("☾")
             window.setProperty("class", "light")
-        
-        window.setStyleSheet(style_sheet)
-        window.style().unpolish(window)
-        window.style().polish(window) 
\ No newline at end of file
+
+        style_sheet = self.style_sheet()
+        if window.styleSheet() != style_sheet:
+            # Première application : Qt analyse la feuille et polit tous les widgets
+            window.setStyleSheet(style_sheet)
+            return
+        # Feuille déjà en place : seuls les sélecteurs .dark / .light changent,
+        # il suffit de repolir les widgets sans relire ni réanalyser la feuille
+        style = window.style()
+        for widget in [window] + window.findChildren(QWidget):
+            style.unpolish(widget)
+            style.polish(widget)
+            # Les marges (padding) changent d'un thème à l'autre
+            widget.updateGeometry()
+            widget.update()
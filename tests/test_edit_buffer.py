@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from PyQt5.QtCore import QCoreApplication
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+from src.database.models import Base, Material
+from src.utils.edit_buffer import EditBuffer
+
+
+class EditBufferTest(unittest.TestCase):
+    """Écriture différée des cellules modifiées dans la table"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Pas de boucle d'événements : flush() est appelé directement
+        cls.application = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        engine = create_engine(f"sqlite:///{os.path.join(directory.name, 'gestcharge.db')}")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.session = Session(engine)
+        self.addCleanup(self.session.close)
+        self.session.add_all([
+            Material(id=1, name="PC-001", location="Siège", comments="ancien"),
+            Material(id=2, name="PC-002", location="Dépôt"),
+        ])
+        self.session.commit()
+
+        self.buffer = EditBuffer(self.session)
+        self.written, self.failed = [], []
+        self.buffer.written.connect(self.written.append)
+        self.buffer.failed.connect(self.failed.append)
+
+    def stored(self, *fields):
+        table = Material.__table__
+        return [tuple(row) for row in self.session.execute(
+            select(*(table.c[field] for field in fields)).order_by(table.c.id)
+        )]
+
+    def test_edits_are_written_in_one_transaction(self):
+        self.buffer.add(1, "location", "Atelier", "Siège")
+        self.buffer.add(1, "comments", "revu", "ancien")
+        self.buffer.add(2, "location", "Atelier", "Dépôt")
+        self.assertTrue(self.buffer.flush())
+
+        self.assertEqual(self.written, [2])
+        self.assertEqual(self.failed, [])
+        self.assertFalse(self.buffer.has_pending())
+        self.assertEqual(self.stored("location", "comments"), [("Atelier", "revu"), ("Atelier", None)])
+
+    def test_rejected_cell_is_reported_and_others_are_written(self):
+        self.session.execute(text(
+            "CREATE TRIGGER refus BEFORE UPDATE ON materials WHEN new.comments = 'refusé' "
+            "BEGIN SELECT RAISE(ABORT, 'commentaire refusé'); END"
+        ))
+        self.session.commit()
+
+        self.buffer.add(1, "comments", "refusé", "ancien")
+        self.buffer.add(1, "location", "Atelier", "Siège")
+        self.buffer.add(2, "comments", "vérifié", None)
+        self.assertFalse(self.buffer.flush())
+
+        # La cellule refusée revient à sa valeur d'origine, les deux autres sont validées
+        self.assertEqual(self.failed, [[(1, "comments", "ancien", "commentaire refusé")]])
+        self.assertEqual(self.written, [2])
+        self.session.expire_all()
+        self.assertEqual(self.stored("location", "comments"), [("Atelier", "ancien"), ("Dépôt", "vérifié")])
+
+
+if __name__ == "__main__":
+    unittest.main()
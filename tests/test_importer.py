@@ -0,0 +1,122 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine, select
+from src.database.models import Base, Material
+from src.utils import importer
+from src.utils.importer import CSV_COLUMNS, import_csv
+
+HEADER = [
+    "Nom", "Numéro de Série", "Adresse MAC", "Marque/Modèle", "Catégorie",
+    "Localisation", "Utilisateur Assigné", "Date d'Assignement", "Commentaires"
+]
+
+
+class ImportTestCase(unittest.TestCase):
+    """Base temporaire et fichiers CSV d'essai"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def create_engine(self, name="inventaire.db"):
+        engine = create_engine(f"sqlite:///{os.path.join(self.directory.name, name)}")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        return engine
+
+    def write_csv(self, rows, name="materiels.csv"):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return path
+
+    @staticmethod
+    def stored_rows(engine):
+        table = Material.__table__
+        with engine.connect() as connection:
+            statement = select(*(table.c[name] for name in CSV_COLUMNS)).order_by(table.c.id)
+            return [tuple(row) for row in connection.execute(statement)]
+
+
+class ParallelImportTest(ImportTestCase):
+
+    def test_parallel_import_matches_serial_import(self):
+        rows = [
+            [
+                f"PC-{i:04d}", f"SN{i:05d}", "", "Dell, Latitude" if i % 5 == 0 else "HP",
+                "Portable", "Siège" if i % 2 else "Dépôt", f"user{i % 17}" if i % 3 else "",
+                "14/07/2024" if i % 4 else "2023-01-31",
+                # Champs entre guillemets sur plusieurs lignes : pas de coupure au milieu
+                "ligne 1\nligne 2 \"citée\"" if i % 7 == 0 else ""
+            ]
+            for i in range(600)
+        ]
+        rows.append(["incomplète", "SN-X"])
+        path = self.write_csv(rows)
+
+        serial_engine = self.create_engine("serie.db")
+        serial = import_csv(serial_engine, path, batch_size=64, workers=1)
+
+        # Petites plages : plusieurs processus et des frontières au milieu du fichier
+        split_file = importer.split_file
+        parallel_engine = self.create_engine("parallele.db")
+        with mock.patch.object(importer, "split_file", lambda file_name: split_file(file_name, 1024)):
+            self.assertGreater(len(importer.split_file(path)), 4)
+            parallel = import_csv(parallel_engine, path, batch_size=64, workers=2)
+
+        self.assertEqual(serial['inserted'], 600)
+        self.assertEqual(parallel['inserted'], 600)
+        self.assertEqual(self.stored_rows(parallel_engine), self.stored_rows(serial_engine))
+
+    def test_cancelled_parallel_import_rolls_back(self):
+        path = self.write_csv([[f"PC-{i:04d}", f"SN{i:05d}"] + [""] * 7 for i in range(600)])
+        engine = self.create_engine()
+        split_file = importer.split_file
+        with mock.patch.object(importer, "split_file", lambda file_name: split_file(file_name, 1024)):
+            with self.assertRaises(importer.ImportCancelled):
+                import_csv(engine, path, batch_size=64, workers=2, is_cancelled=lambda: True)
+        self.assertEqual(self.stored_rows(engine), [])
+
+
+class MergeImportTest(ImportTestCase):
+
+    def test_second_import_updates_matching_rows(self):
+        first = [
+            ["PC-A", "SN 001", "", "HP", "Portable", "Siège", "alice", "14/07/2024", ""],
+            ["PC-B", "", "AA:BB:CC:DD:EE:01", "Dell", "Portable", "Dépôt", "", "", ""],
+            ["PC-C", "SN002", "", "Lenovo", "Écran", "Siège", "", "", "neuf"],
+        ]
+        engine = self.create_engine()
+        result = import_csv(engine, self.write_csv(first), mode="merge")
+        self.assertEqual((result['inserted'], result['updated'], result['unchanged']), (3, 0, 0))
+
+        # PC-B retrouvé par son adresse MAC écrite autrement, puis déplacé ; PC-D est nouveau
+        second = [
+            first[0],
+            ["PC-B", "", "aa-bb-cc-dd-ee-01", "Dell", "Portable", "Atelier", "bob", "", ""],
+            first[2],
+            ["PC-D", "sn003", "", "HP", "Portable", "Atelier", "", "", ""],
+        ]
+        result = import_csv(engine, self.write_csv(second, "sync.csv"), mode="merge")
+        self.assertEqual((result['inserted'], result['updated'], result['unchanged']), (1, 1, 2))
+
+        rows = self.stored_rows(engine)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1], ("PC-B", None, "aa-bb-cc-dd-ee-01", "Dell", "Portable", "Atelier", "bob", None, None))
+        self.assertEqual([row[0] for row in rows], ["PC-A", "PC-B", "PC-C", "PC-D"])
+
+    def test_serial_number_is_matched_without_spaces_or_case(self):
+        engine = self.create_engine()
+        import_csv(engine, self.write_csv([["PC-A", "SN 001"] + [""] * 7]), mode="merge")
+        result = import_csv(engine, self.write_csv([["PC-A2", "sn001"] + [""] * 7], "sync.csv"), mode="merge")
+        self.assertEqual((result['inserted'], result['updated'], result['unchanged']), (0, 1, 0))
+        self.assertEqual([row[:2] for row in self.stored_rows(engine)], [("PC-A2", "sn001")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, delete, text, update
+from src.database.migrations import SUMMARY_TABLE, run_migrations
+from src.database.models import Base, Material
+from src.utils.inventory_stats import compute_statistics, verify_summary_tables
+
+
+class SummaryTablesTest(unittest.TestCase):
+    """Compteurs du tableau de bord tenus par les triggers de la migration 2"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(directory.name, 'gestcharge.db')}")
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(self.engine)
+        run_migrations(self.engine)
+        self.table = Material.__table__
+
+    def execute(self, statement):
+        with self.engine.begin() as connection:
+            connection.execute(statement)
+            return verify_summary_tables(connection)
+
+    def test_counters_follow_inserts_updates_and_deletes(self):
+        with self.engine.begin() as connection:
+            connection.execute(self.table.insert(), [
+                {"name": f"PC-{i:03d}", "category": "Portable" if i % 3 else None,
+                 "location": ("Siège", "Dépôt", None)[i % 3], "assigned_user": f"user{i % 4}" if i % 2 else None}
+                for i in range(30)
+            ])
+            self.assertEqual(verify_summary_tables(connection), [])
+
+        # Valeur renseignée, effacée, puis plusieurs colonnes à la fois
+        self.assertEqual(self.execute(
+            update(self.table).where(self.table.c.category.is_(None)).values(category="Écran")
+        ), [])
+        self.assertEqual(self.execute(
+            update(self.table).where(self.table.c.location == "Dépôt").values(location=None)
+        ), [])
+        self.assertEqual(self.execute(
+            update(self.table).where(self.table.c.id <= 10).values(assigned_user="alice", location="Atelier")
+        ), [])
+        # Modification sans changement de valeur : aucun compteur ne bouge
+        self.assertEqual(self.execute(update(self.table).values(category=self.table.c.category)), [])
+
+        self.assertEqual(self.execute(delete(self.table).where(self.table.c.category == "Écran")), [])
+        self.assertEqual(self.execute(delete(self.table).where(self.table.c.assigned_user.is_(None))), [])
+
+        with self.engine.connect() as connection:
+            statistics = compute_statistics(connection)
+            self.assertEqual(statistics, compute_statistics(connection, use_summary=False))
+            self.assertEqual(statistics['total'], 13)
+
+        self.assertEqual(self.execute(delete(self.table)), [])
+
+    def test_drift_is_reported(self):
+        with self.engine.begin() as connection:
+            connection.execute(self.table.insert(), [{"name": "PC-001", "location": "Siège"}])
+            connection.execute(text(f"UPDATE {SUMMARY_TABLE} SET count = 5 WHERE value = 'Siège'"))
+            self.assertEqual(verify_summary_tables(connection), [("locations", "Siège", 5, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+from src.database.db_setup import create_database_engine
+from src.database.models import Base, Material, MaterialRecord
+from src.database.queries import fetch_material_page, material_records_statement, material_search_clause, page_key
+from src.utils.search_index import SearchIndex, parse_query
+
+
+class FetchMaterialPageTest(unittest.TestCase):
+    """Pagination par clé de la table en mode paginé"""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        locations = ["Bureau", "Atelier", None, "Salle 2", "Accueil"]
+        self.session.add_all(
+            Material(
+                name=f"PC-{i % 7:02d}",
+                location=locations[i % len(locations)],
+                assignment_date=datetime(2024, 1, 1 + i % 28) if i % 3 else None
+            )
+            for i in range(60)
+        )
+        self.session.commit()
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record_statement)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _record_statement(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def _all_pages(self, sort_field, descending, limit=7):
+        rows, after = [], None
+        while True:
+            page = fetch_material_page(self.session, sort_field, descending, after, limit)
+            rows.extend(page)
+            if len(page) < limit:
+                return rows
+            after = page_key(page[-1], sort_field)
+
+    def _expected_ids(self, sort_field, descending):
+        materials = self.session.query(Material).all()
+        filled = sorted((m for m in materials if getattr(m, sort_field) is not None),
+                        key=lambda m: (getattr(m, sort_field), m.id))
+        empty = sorted((m for m in materials if getattr(m, sort_field) is None), key=lambda m: m.id)
+        ordered = filled + empty
+        return [m.id for m in (ordered[::-1] if descending else ordered)]
+
+    def test_pages_follow_sort_order_with_nulls_last(self):
+        for sort_field in ("name", "location", "assignment_date"):
+            for descending in (False, True):
+                with self.subTest(sort_field=sort_field, descending=descending):
+                    ids = [record.id for record in self._all_pages(sort_field, descending)]
+                    self.assertEqual(ids, self._expected_ids(sort_field, descending))
+
+    def test_page_queries_use_column_index(self):
+        for descending in (False, True):
+            with self.subTest(descending=descending):
+                self.statements.clear()
+                self._all_pages("location", descending)
+                self.assertTrue(self.statements)
+                connection = self.session.connection()
+                for statement, parameters in list(self.statements):
+                    plan = " ".join(
+                        row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+                    )
+                    self.assertIn("ix_materials_location", plan)
+                    self.assertNotIn("TEMP B-TREE", plan)
+
+
+class MaterialSearchClauseTest(unittest.TestCase):
+    """Recherche SQL sans FTS5 (export, mode paginé) : mêmes résultats que l'index en mémoire"""
+
+    def setUp(self):
+        # Moteur de l'application : fonction fold() enregistrée sur chaque connexion
+        self.engine = create_database_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        self.session.add_all([
+            Material(name="PC-001", location="Siège", category="Écran"),
+            Material(name="Dupont", location="Siege annexe", category="ecran"),
+            Material(name="a_b%c", location="Dépôt", comments="ŒUVRE"),
+        ])
+        self.session.commit()
+        self.index = SearchIndex()
+        self.index.build([MaterialRecord.from_row(row) for row in self.session.execute(material_records_statement())])
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def matching_ids(self, search_text):
+        clause = material_search_clause(parse_query(search_text))
+        return set(self.session.execute(select(Material.id).where(clause)).scalars())
+
+    def test_accents_and_case_are_ignored_like_search_index(self):
+        for search_text in ("siege", "SIÈGE", "écran", "lieu:depot", "cat:ECRAN pont", "œuvre", "é", "_", "%"):
+            with self.subTest(search_text=search_text):
+                self.assertEqual(self.matching_ids(search_text), self.index.search(search_text))
+        self.assertEqual(self.matching_ids("siege"), {1, 2})
+        self.assertEqual(self.matching_ids("a_b"), {3})
+
+
+if __name__ == "__main__":
+    unittest.main()
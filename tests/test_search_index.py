@@ -0,0 +1,36 @@
+import unittest
+from src.database.models import MaterialRecord, RECORD_FIELDS
+from src.utils.search_index import SearchIndex
+
+
+def record(material_id, **values):
+    return MaterialRecord(*(material_id if field == "id" else values.get(field) for field in RECORD_FIELDS))
+
+
+class SearchIndexTest(unittest.TestCase):
+    """Index de trigrammes en mémoire"""
+
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.build([
+            record(1, name="PC-001", location="Siège", category="Écran"),
+            record(2, name="PC-002", location="Siege annexe", category="Ecran"),
+            record(3, name="PC-003", location="Dépôt", category="Clavier"),
+        ])
+
+    def test_accents_are_ignored_like_fulltext_search(self):
+        self.assertEqual(self.index.search("siege"), {1, 2})
+        self.assertEqual(self.index.search("Siège"), {1, 2})
+        self.assertEqual(self.index.search("lieu:SIÈGE cat:ecran"), {1, 2})
+        self.assertEqual(self.index.search("depot"), {3})
+        self.assertEqual(self.index.search("é"), {1, 2, 3})
+
+    def test_update_reindexes_folded_text(self):
+        moved = record(3, name="PC-003", location="Entrepôt", category="Clavier")
+        self.index.update(moved)
+        self.assertEqual(self.index.search("depot"), set())
+        self.assertEqual(self.index.search("entrepot"), {3})
+
+
+if __name__ == "__main__":
+    unittest.main()
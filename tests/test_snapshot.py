@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from operator import attrgetter
+from sqlalchemy.orm import Session
+from src.database.db_setup import create_database_engine, setup_database
+from src.database.models import Material, MaterialRecord, RECORD_FIELDS
+from src.database.queries import bulk_update_materials, get_change_version, material_records_statement
+from src.utils.snapshot import read_snapshot, write_snapshot
+
+record_values = attrgetter(*RECORD_FIELDS)
+
+
+class SnapshotTest(unittest.TestCase):
+    """Instantané du cache, valide tant que le compteur de modifications (migration 3) n'a pas bougé"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "gestcharge.db.snapshot")
+        engine = create_database_engine(f"sqlite:///{os.path.join(directory.name, 'gestcharge.db')}")
+        self.addCleanup(engine.dispose)
+        setup_database(engine)
+        self.session = Session(engine)
+        self.addCleanup(self.session.close)
+        self.session.add_all([
+            Material(name="PC-001", serial_number="SN001", location="Siège", category="Portable",
+                     assigned_user="alice", assignment_date=datetime(2024, 7, 14, 9, 30)),
+            Material(name="PC-002", location="Dépôt", category="Portable", comments="écran fêlé"),
+            Material(name="Écran-003", category="Écran"),
+        ])
+        self.session.commit()
+
+    def load_records(self):
+        return [MaterialRecord.from_row(row) for row in self.session.execute(material_records_statement())]
+
+    def test_round_trip_at_same_version(self):
+        records = self.load_records()
+        version = get_change_version(self.session)
+        write_snapshot(self.path, records, version)
+
+        # Démarrage suivant : base inchangée, l'instantané est utilisé
+        loaded = read_snapshot(self.path, get_change_version(self.session))
+        self.assertIsNotNone(loaded)
+        self.assertEqual([record_values(record) for record in loaded], [record_values(record) for record in records])
+
+    def test_update_makes_snapshot_stale(self):
+        version = get_change_version(self.session)
+        write_snapshot(self.path, self.load_records(), version)
+
+        material_id = self.session.query(Material.id).filter_by(name="PC-002").scalar()
+        bulk_update_materials(self.session, [material_id], {"location": "Atelier"})
+        self.session.commit()
+
+        current = get_change_version(self.session)
+        self.assertEqual(current[0], version[0])
+        self.assertGreater(current[1], version[1])
+        self.assertIsNone(read_snapshot(self.path, current))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import os
+import unittest
+from src.utils.startup_time import DEFAULT_BUDGET_MS, check_startup
+
+# Budget adaptable à une machine plus lente (ex: intégration continue)
+BUDGET_MS = float(os.environ.get("GESTCHARGE_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+
+class StartupTimeTest(unittest.TestCase):
+    """Budget d'import de la fenêtre principale, mesuré avec -X importtime"""
+
+    def test_main_window_imports_within_budget(self):
+        result = check_startup(budget_ms=BUDGET_MS, runs=3)
+        self.assertEqual(result['deferred'], [], "modules différés chargés au démarrage")
+        self.assertTrue(
+            result['ok'],
+            f"import en {result['median_ms']:.0f} ms pour un budget de {result['budget_ms']:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()